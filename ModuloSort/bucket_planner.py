@@ -0,0 +1,282 @@
+from itertools import compress
+from time import perf_counter
+from typing import Dict, List, Optional
+from radix_sort import RadixBuffers, RadixSort
+from sorting_utilities import SortingUtils
+
+
+class BucketPlanner:
+
+    """
+    Cost model choosing how every bucket of modulo sort is sorted, from the bucket size and the span of its keys.
+    """
+
+    STRATEGIES = ('single', 'swap', 'insertion', 'presence', 'counting', 'radix')
+
+    # Maximum number of short runs merged pairwise
+    MERGE_RUNS = 16
+
+    # Average run length from which every eightfold increase halves the number of runs merged
+    MERGE_RUN_LENGTH = 4096
+
+    # Minimum average run length for which run merging beats distributing into buckets
+    RUN_LENGTH = 32
+
+    # Number of direct-address slots scanned at C speed in the time of one interpreted element operation
+    SCAN_SPEED = 32
+
+    def __init__(self, record: bool = False):
+        """
+        Initializes the planner.
+
+        Args:
+            record (bool): Whether to record, for every strategy, the number of buckets and elements it handled
+                           and the time it took. Recording adds a timer call around every bucket.
+        """
+        self.record = record
+        self.route = None
+        self.buckets = dict.fromkeys(BucketPlanner.STRATEGIES, 0)
+        self.elements = dict.fromkeys(BucketPlanner.STRATEGIES, 0)
+        self.seconds = dict.fromkeys(BucketPlanner.STRATEGIES, 0.0)
+
+    def choose_route(self, length: int, ascending_runs: int, descending_runs: Optional[int] = None,
+                     merge: bool = True) -> str:
+        """
+        Chooses how a whole array is sorted from its presortedness, and remembers the choice in self.route.
+
+        Args:
+            length (int): The number of elements in the array.
+            ascending_runs (int): The number of non-decreasing runs in the array.
+            descending_runs (Optional[int]): The number of non-increasing runs, if it was counted.
+            merge (bool): Whether the merging routes may be taken. They are slower than the vectorized backend,
+                          so they are ruled out when the array would be handed over to it.
+
+        Returns:
+            str: 'sorted' or 'reversed' when the array only needs copying, 'runs' or 'reversed_runs' when its few
+                 runs are merged, 'outliers' when the elements breaking a nearly sorted order are sorted apart and
+                 merged back, or 'buckets' for the regular modulo sort.
+
+        Notes:
+            - Every level of pairwise merging touches every element, so only a few runs are merged, and fewer
+              when they are long (see max_merge_runs). Reversing descending runs costs about one more level.
+        """
+        if ascending_runs == 1:
+            self.route = 'sorted'
+        elif descending_runs == 1:
+            self.route = 'reversed'
+        elif not merge:
+            self.route = 'buckets'
+        elif ascending_runs <= BucketPlanner.max_merge_runs(length // ascending_runs):
+            self.route = 'runs'
+        elif (descending_runs is not None
+              and 2 * descending_runs <= BucketPlanner.max_merge_runs(length // descending_runs)):
+            self.route = 'reversed_runs'
+        elif ascending_runs * BucketPlanner.RUN_LENGTH <= length:
+            self.route = 'outliers'
+        else:
+            self.route = 'buckets'
+        return self.route
+
+    @staticmethod
+    def max_merge_runs(run_length: int) -> int:
+        """
+        Finds the largest number of runs for which merging them pairwise beats distributing into buckets.
+
+        Args:
+            run_length (int): The average number of elements in a run.
+
+        Returns:
+            int: MERGE_RUNS for runs shorter than MERGE_RUN_LENGTH, halved for every eightfold increase of the
+                 run length beyond it, down to 2.
+
+        Notes:
+            - Merging interleaved runs pays an interpreted binary search for almost every element on every level,
+              and long runs spill out of the caches, so each level gets more expensive as runs grow.
+        """
+        limit = BucketPlanner.MERGE_RUNS
+        run_length //= BucketPlanner.MERGE_RUN_LENGTH
+        while run_length and limit > 2:
+            limit //= 2
+            run_length //= 8
+        return limit
+
+    def choose(self, size: int, span: int, maximum: Optional[int] = None) -> str:
+        """
+        Chooses the cheapest strategy for a bucket.
+
+        Args:
+            size (int): The number of elements in the bucket.
+            span (int): The number of possible keys between the smallest and the largest key of the bucket.
+            maximum (Optional[int]): The largest key of the bucket. Radix sort runs on the keys themselves, so
+                                     its bit width sets the number of radix passes. Defaults to span - 1, for
+                                     keys starting at 0.
+
+        Returns:
+            str: One of STRATEGIES.
+
+        Notes:
+            - Costs are expressed in interpreted element operations: insertion sort is quadratic, a presence scan
+              touches every element once and scans the span at C speed, radix sort pays every element and every
+              counter on each pass.
+            - A bucket with at least as many elements as keys always goes to counting sort.
+        """
+        if size == 1:
+            return 'single'
+        if size <= 3:
+            return 'swap'
+        if size >= span:
+            return 'counting'
+
+        if maximum is None:
+            maximum = span - 1
+        radix_bits = RadixSort.choose_radix_bits(size, maximum)
+        radix_passes = -(-max(1, maximum.bit_length()) // radix_bits)
+        costs = {
+            'insertion': size * size / 4,
+            'presence': size + span / BucketPlanner.SCAN_SPEED,
+            'radix': radix_passes * (2 * size + (1 << radix_bits)),
+        }
+        return min(costs, key=costs.get)
+
+    def note(self, strategy: str, size: int, seconds: float = 0.0) -> None:
+        """
+        Records that a bucket was handled by a strategy.
+
+        Args:
+            strategy (str): The strategy used.
+            size (int): The number of elements in the bucket.
+            seconds (float): The time spent sorting the bucket.
+
+        Returns:
+            None
+        """
+        self.buckets[strategy] += 1
+        self.elements[strategy] += size
+        self.seconds[strategy] += seconds
+
+    def sort_bucket(self, modulo_values: List[int], bucket_base: int, radix_buffers: RadixBuffers) -> List[int]:
+        """
+        Sorts the modulo values of a bucket with the cheapest strategy and turns them back into values.
+
+        Args:
+            modulo_values (List[int]): The modulo values of the bucket, with duplicates.
+            bucket_base (int): The lowest value the bucket can hold.
+            radix_buffers (RadixBuffers): Radix sort scratch space shared by all buckets.
+
+        Returns:
+            List[int]: The values of the bucket, sorted in ascending order.
+        """
+        start_time = perf_counter() if self.record else 0.0
+
+        low, high = min(modulo_values), max(modulo_values)
+        span = high - low + 1
+        strategy = self.choose(len(modulo_values), span, high)
+
+        if strategy == 'counting':
+            sorted_bucket = BucketPlanner.counting_sort(modulo_values, bucket_base + low, low, span)
+        elif strategy == 'presence':
+            sorted_bucket = BucketPlanner.presence_sort(modulo_values, bucket_base + low, low, span)
+        elif strategy == 'insertion':
+            sorted_bucket = [bucket_base + modulo_val for modulo_val in SortingUtils.insertion_sort(modulo_values)]
+        elif strategy == 'radix':
+            sorted_bucket = BucketPlanner.radix_sort(modulo_values, bucket_base, radix_buffers)
+        else:
+            sorted_small = SortingUtils.sort_small_array(modulo_values, length=len(modulo_values))
+            sorted_bucket = [bucket_base + modulo_val for modulo_val in sorted_small]
+
+        if self.record:
+            self.note(strategy, len(modulo_values), perf_counter() - start_time)
+
+        return sorted_bucket
+
+    def summary(self) -> Dict[str, Dict[str, float]]:
+        """
+        Summarizes the recorded choices.
+
+        Returns:
+            Dict[str, Dict[str, float]]: For every strategy used at least once, its number of buckets,
+                                         number of elements and time spent.
+        """
+        return {strategy: {'buckets': self.buckets[strategy], 'elements': self.elements[strategy],
+                           'seconds': self.seconds[strategy]}
+                for strategy in BucketPlanner.STRATEGIES if self.buckets[strategy]}
+
+    @staticmethod
+    def counting_sort(modulo_values: List[int], first_value: int, low: int, span: int) -> List[int]:
+        """
+        Sorts a dense bucket by counting the occurrences of every key.
+
+        Args:
+            modulo_values (List[int]): The modulo values of the bucket.
+            first_value (int): The value matching the smallest modulo value.
+            low (int): The smallest modulo value.
+            span (int): The number of possible keys in the bucket.
+
+        Returns:
+            List[int]: The values of the bucket, sorted in ascending order.
+        """
+        count = [0] * span
+        for modulo_val in modulo_values:
+            count[modulo_val - low] += 1
+
+        # Occupied keys are found at C speed and repeated values are emitted in bulk
+        sorted_bucket = []
+        for key in compress(range(span), count):
+            SortingUtils.append_duplicates(to_append=first_value + key, count=count[key], sorted_arr=sorted_bucket)
+        return sorted_bucket
+
+    @staticmethod
+    def presence_sort(modulo_values: List[int], first_value: int, low: int, span: int) -> List[int]:
+        """
+        Sorts a bucket by marking its keys in a direct-address table and scanning the table.
+
+        Args:
+            modulo_values (List[int]): The modulo values of the bucket.
+            first_value (int): The value matching the smallest modulo value.
+            low (int): The smallest modulo value.
+            span (int): The number of possible keys in the bucket.
+
+        Returns:
+            List[int]: The values of the bucket, sorted in ascending order.
+        """
+        marks = bytearray(span)
+        for modulo_val in modulo_values:
+            marks[modulo_val - low] = 1
+
+        # Without duplicates, the marked values are the sorted bucket
+        sorted_keys = compress(range(first_value, first_value + span), marks)
+        if marks.count(1) == len(modulo_values):
+            return list(sorted_keys)
+
+        multiplicities = SortingUtils.count_duplicates(modulo_values)
+        sorted_bucket = []
+        for value in sorted_keys:
+            SortingUtils.append_duplicates(to_append=value, count=multiplicities[value - first_value + low],
+                                           sorted_arr=sorted_bucket)
+        return sorted_bucket
+
+    @staticmethod
+    def radix_sort(modulo_values: List[int], bucket_base: int, radix_buffers: RadixBuffers) -> List[int]:
+        """
+        Sorts a sparse bucket with radix sort on its distinct keys.
+
+        Args:
+            modulo_values (List[int]): The modulo values of the bucket.
+            bucket_base (int): The lowest value the bucket can hold.
+            radix_buffers (RadixBuffers): Radix sort scratch space shared by all buckets.
+
+        Returns:
+            List[int]: The values of the bucket, sorted in ascending order.
+        """
+        # Repeated modulo values are tracked as multiplicities, so Radix sort only sees distinct keys
+        multiplicities = SortingUtils.count_duplicates(modulo_values)
+        sorted_modulo = RadixSort.sorter(list(multiplicities), buffers=radix_buffers)
+
+        if len(sorted_modulo) == len(modulo_values):
+            return [bucket_base + modulo_val for modulo_val in sorted_modulo]
+
+        sorted_bucket = []
+        for modulo_val in sorted_modulo:
+            SortingUtils.append_duplicates(to_append=bucket_base + modulo_val, count=multiplicities[modulo_val],
+                                           sorted_arr=sorted_bucket)
+        return sorted_bucket
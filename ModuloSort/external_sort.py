@@ -0,0 +1,184 @@
+import os
+import tempfile
+from array import array
+from typing import BinaryIO, Iterator, List, Optional, Tuple
+from modulo_sort import ModuloSort
+from sorting_utilities import SortingUtils
+
+
+class ExternalModuloSort:
+
+    """
+    Implementation of out-of-core Modulo Sort for binary files of signed 64-bit integers.
+    """
+
+    # Estimated number of bytes needed to sort one element in memory (list entry, int object and sort buffers)
+    BYTES_PER_ELEMENT = 100
+
+    # Number of elements read from disk at a time
+    READ_CHUNK = 1 << 16
+
+    @staticmethod
+    def sorter(input_path: str, output_path: str, memory_limit: int = 256 * 1024 ** 2,
+               temp_dir: Optional[str] = None) -> int:
+        """
+        Sorts a file of native-endian int64 values that may be larger than the available memory.
+
+        Args:
+            input_path (str): The file holding the values to be sorted.
+            output_path (str): The file the sorted values are written to.
+            memory_limit (int): The approximate number of bytes the sort may keep in memory at once.
+            temp_dir (Optional[str]): The directory for partition files. Defaults to the system temporary directory.
+
+        Returns:
+            int: The number of values written to the output file.
+
+        Notes:
+            - Partitions are ranges of ModuloSort buckets, so writing the sorted partitions one after the other
+              produces the sorted output without a final merge.
+            - A partition that still exceeds the memory budget, e.g. because of a skewed distribution, is sorted
+              recursively in the same way.
+        """
+        budget = max(ExternalModuloSort.READ_CHUNK, memory_limit // ExternalModuloSort.BYTES_PER_ELEMENT)
+
+        with open(output_path, 'wb') as output_file:
+            return ExternalModuloSort._sort_file(input_path, output_file, budget, temp_dir)
+
+    @staticmethod
+    def _read_chunks(path: str) -> Iterator[array]:
+        """
+        Streams the values of a binary int64 file.
+
+        Args:
+            path (str): The file to read.
+
+        Returns:
+            Iterator[array]: Consecutive chunks of at most READ_CHUNK values.
+        """
+        with open(path, 'rb') as input_file:
+            while True:
+                chunk = input_file.read(8 * ExternalModuloSort.READ_CHUNK)
+                if not chunk:
+                    return
+                values = array('q')
+                values.frombytes(chunk)
+                yield values
+
+    @staticmethod
+    def _scan(path: str) -> Tuple[int, int, int]:
+        """
+        Finds the minimum, the maximum and the number of values of a file in one streaming pass.
+
+        Args:
+            path (str): The file to scan.
+
+        Returns:
+            Tuple[int, int, int]: The minimum value, the maximum value and the number of values.
+        """
+        minimum, maximum, count = None, None, 0
+
+        for values in ExternalModuloSort._read_chunks(path):
+            chunk_min, chunk_max = min(values), max(values)
+            minimum = chunk_min if minimum is None else min(minimum, chunk_min)
+            maximum = chunk_max if maximum is None else max(maximum, chunk_max)
+            count += len(values)
+
+        return minimum, maximum, count
+
+    @staticmethod
+    def _sort_file(path: str, output_file: BinaryIO, budget: int, temp_dir: Optional[str]) -> int:
+        """
+        Appends the sorted values of a file to an open output file.
+
+        Args:
+            path (str): The file holding the values to be sorted.
+            output_file (BinaryIO): The file the sorted values are appended to.
+            budget (int): The maximum number of values sorted in memory at once.
+            temp_dir (Optional[str]): The directory for partition files.
+
+        Returns:
+            int: The number of values written.
+        """
+        min_value, max_value, count = ExternalModuloSort._scan(path)
+
+        if count == 0:
+            return 0
+
+        # Small inputs are sorted in memory straight away
+        if count <= budget:
+            values = array('q')
+            for chunk in ExternalModuloSort._read_chunks(path):
+                values.extend(chunk)
+            array('q', ModuloSort.sorter(values.tolist())).tofile(output_file)
+            return count
+
+        # A range made of a single value is already sorted
+        if min_value == max_value:
+            for chunk in ExternalModuloSort._read_chunks(path):
+                chunk.tofile(output_file)
+            return count
+
+        # Group consecutive buckets into partitions expected to fit the memory budget
+        modulo_range = SortingUtils.compute_modulo_range(min_value, max_value, count)
+        maximum_bucket = (max_value - min_value) // modulo_range
+        partitions = max(2, 2 * count // budget)
+        buckets_per_partition = maximum_bucket // partitions + 1
+
+        with tempfile.TemporaryDirectory(dir=temp_dir) as partition_dir:
+            partition_paths = [os.path.join(partition_dir, f'{partition}.bin') for partition in range(partitions)]
+            ExternalModuloSort._spill(path, partition_paths, min_value, modulo_range * buckets_per_partition, budget)
+
+            # Partitions cover increasing value ranges, so they are simply written one after the other
+            for partition_path in partition_paths:
+                if os.path.exists(partition_path):
+                    ExternalModuloSort._sort_file(partition_path, output_file, budget, temp_dir)
+                    os.remove(partition_path)
+
+        return count
+
+    @staticmethod
+    def _spill(path: str, partition_paths: List[str], min_value: int, partition_range: int, budget: int) -> None:
+        """
+        Distributes the values of a file into partition files by floor division.
+
+        Args:
+            path (str): The file holding the values to be distributed.
+            partition_paths (List[str]): The file of every partition.
+            min_value (int): The minimum value in the file.
+            partition_range (int): The width of the value range covered by every partition.
+            budget (int): The maximum number of values buffered in memory before they are flushed to disk.
+
+        Returns:
+            None
+        """
+        buffers = [array('q') for _ in partition_paths]
+        buffered = 0
+
+        for values in ExternalModuloSort._read_chunks(path):
+            for num in values:
+                buffers[(num - min_value) // partition_range].append(num)
+            buffered += len(values)
+
+            if buffered >= budget:
+                ExternalModuloSort._flush(buffers, partition_paths)
+                buffered = 0
+
+        ExternalModuloSort._flush(buffers, partition_paths)
+
+    @staticmethod
+    def _flush(buffers: List[array], partition_paths: List[str]) -> None:
+        """
+        Appends every non-empty buffer to its partition file and empties it.
+
+        Args:
+            buffers (List[array]): The buffered values of every partition.
+            partition_paths (List[str]): The file of every partition.
+
+        Returns:
+            None
+        """
+        for buffer, partition_path in zip(buffers, partition_paths):
+            if buffer:
+                with open(partition_path, 'ab') as partition_file:
+                    buffer.tofile(partition_file)
+                del buffer[:]
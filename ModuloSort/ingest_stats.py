@@ -0,0 +1,88 @@
+from array import array
+from typing import List, Optional, Union
+from sorting_utilities import SortingUtils
+
+
+class IngestStats:
+
+    """
+    Summary of an input array, gathered once and consumed by every later step of modulo sort.
+    """
+
+    def __init__(self, arr: List[int]):
+        """
+        Scans a non-empty array of integers.
+
+        Args:
+            arr (List[int]): The array of integers. It must not be modified while the statistics are in use.
+
+        Notes:
+            - The length, the extremes and the descents are found by builtins at C speed, without copying the
+              array. Sorted and reversed arrays take their extremes from their ends.
+            - The ascents and the bucket histogram are computed from the array when first asked for, so that
+              routes which do not need them skip their passes. Use check to make sure the statistics are used
+              with the array they were gathered from.
+            - Duplicates are not counted here: every bucket counts the multiplicities of its own modulo values
+              when it is sorted.
+        """
+        self._arr = arr
+        self.length = len(arr)
+        self.descents = SortingUtils.count_descents(arr)
+        self._ascents: Optional[int] = None
+        self._bucket_offsets: Optional[Union[array, List[int]]] = None
+
+        if self.descents == 0:
+            self.min_value, self.max_value = arr[0], arr[-1]
+        else:
+            self.min_value, self.max_value = min(arr), max(arr)
+
+        self.modulo_range = SortingUtils.compute_modulo_range(self.min_value, self.max_value, self.length)
+        self.maximum_bucket = (self.max_value - self.min_value) // self.modulo_range
+
+    def check(self, arr: List[int]) -> None:
+        """
+        Checks that the statistics were gathered from an array and that its length has not changed since.
+
+        Args:
+            arr (List[int]): The array the statistics are about to be used with.
+
+        Returns:
+            None
+
+        Raises:
+            ValueError: If the statistics were gathered from another array, or if the array grew or shrank.
+
+        Notes:
+            - Elements replaced in place without changing the length cannot be detected.
+        """
+        if arr is not self._arr:
+            raise ValueError("The statistics were gathered from another array")
+        if len(arr) != self.length:
+            raise ValueError(f"The array holds {len(arr)} values but held {self.length} when it was scanned")
+
+    @property
+    def ascents(self) -> int:
+        """
+        The number of positions where an element is greater than the one before it.
+        """
+        if self._ascents is None:
+            self._ascents = SortingUtils.count_ascents(self._arr)
+        return self._ascents
+
+    @property
+    def bucket_offsets(self) -> Union[array, List[int]]:
+        """
+        The bucket histogram, as maximum_bucket + 2 offsets: bucket index lives in [offsets[i], offsets[i + 1]).
+        """
+        if self._bucket_offsets is None:
+            min_value, modulo_range = self.min_value, self.modulo_range
+
+            bucket_offsets = SortingUtils.allocate_buffer(self.maximum_bucket + 2, self.length)
+            for num in self._arr:
+                bucket_offsets[(num - min_value) // modulo_range + 1] += 1
+
+            for index in range(1, self.maximum_bucket + 2):
+                bucket_offsets[index] += bucket_offsets[index - 1]
+
+            self._bucket_offsets = bucket_offsets
+        return self._bucket_offsets
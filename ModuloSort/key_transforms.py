@@ -0,0 +1,167 @@
+from array import array
+from typing import List, Optional, Union
+
+try:
+    import numpy as np
+except ImportError:
+    np = None
+
+
+class KeyTransforms:
+
+    """
+    Order-preserving bit transforms between typed keys and unsigned 64-bit integers.
+    """
+
+    SIGN_BIT = 1 << 63
+    MASK = (1 << 64) - 1
+
+    # Array typecode of every supported key type
+    TYPECODES = {'int64': 'q', 'uint64': 'Q', 'float64': 'd'}
+
+    # Smallest and largest value of every integer key type
+    INTEGER_RANGES = {'int64': (-(1 << 63), (1 << 63) - 1), 'uint64': (0, (1 << 64) - 1)}
+
+    @staticmethod
+    def encode(values: List[Union[int, float]], key_type: str) -> List[int]:
+        """
+        Maps typed keys to unsigned 64-bit integers with the same ordering.
+
+        Args:
+            values (List[Union[int, float]]): The keys to transform.
+            key_type (str): One of 'int64', 'uint64' or 'float64'.
+
+        Returns:
+            List[int]: Non-negative integers below 2 ** 64, ordered like the original keys.
+
+        Raises:
+            ValueError: If a key does not fit in an integer key type.
+
+        Notes:
+            - Signed integers have their sign bit flipped, which is the same as adding 2 ** 63.
+            - Non-negative floats have their sign bit set, negative floats have all their bits flipped. Negative
+              zero sorts before positive zero, and NaNs sort before -inf or after +inf depending on their sign.
+        """
+        KeyTransforms.check_range(values, key_type)
+        bits = KeyTransforms._to_bits(values, key_type)
+
+        if key_type == 'int64':
+            return [bit ^ KeyTransforms.SIGN_BIT for bit in bits]
+        elif key_type == 'float64':
+            return [bit ^ KeyTransforms.MASK if bit >> 63 else bit | KeyTransforms.SIGN_BIT for bit in bits]
+        return bits.tolist()
+
+    @staticmethod
+    def decode(keys: List[int], key_type: str) -> List[Union[int, float]]:
+        """
+        Maps unsigned 64-bit integers produced by encode back to the original typed keys.
+
+        Args:
+            keys (List[int]): The transformed keys.
+            key_type (str): The key type passed to encode.
+
+        Returns:
+            List[Union[int, float]]: The original keys, bit for bit.
+        """
+        if key_type == 'int64':
+            bits = array('Q', [key ^ KeyTransforms.SIGN_BIT for key in keys])
+        elif key_type == 'float64':
+            bits = array('Q', [key ^ KeyTransforms.SIGN_BIT if key >> 63 else key ^ KeyTransforms.MASK
+                               for key in keys])
+        else:
+            bits = array('Q', keys)
+
+        return memoryview(bits).cast('B').cast(KeyTransforms.typecode(key_type)).tolist()
+
+    @staticmethod
+    def encode_np(values: "np.ndarray") -> "np.ndarray":
+        """
+        Maps a NumPy array of signed integers or floats to uint64 keys with the same ordering.
+
+        Args:
+            values (np.ndarray): The keys to transform. Integer dtypes are widened to int64, floats to float64.
+
+        Returns:
+            np.ndarray: A uint64 array, ordered like the original keys.
+        """
+        if values.dtype.kind == 'f':
+            bits = values.astype(np.float64).view(np.uint64)
+            return np.where(bits >> np.uint64(63), ~bits, bits | np.uint64(KeyTransforms.SIGN_BIT))
+        elif values.dtype.kind == 'i':
+            return values.astype(np.int64).view(np.uint64) ^ np.uint64(KeyTransforms.SIGN_BIT)
+        return values.astype(np.uint64)
+
+    @staticmethod
+    def infer_key_type(values: List[Union[int, float]]) -> Optional[str]:
+        """
+        Picks the key type able to hold every value exactly.
+
+        Args:
+            values (List[Union[int, float]]): The keys, not all of which need to have the same type.
+
+        Returns:
+            Optional[str]: 'float64' if any key is a float, otherwise 'int64' if any key is negative, otherwise
+                           'uint64'. None if the integers do not fit in the chosen type.
+        """
+        if any(isinstance(value, float) for value in values):
+            return 'float64'
+        if not values:
+            return 'uint64'
+
+        min_value, max_value = min(values), max(values)
+        key_type = 'int64' if min_value < 0 else 'uint64'
+        low, high = KeyTransforms.INTEGER_RANGES[key_type]
+        return key_type if low <= min_value and max_value <= high else None
+
+    @staticmethod
+    def check_range(values: List[Union[int, float]], key_type: str) -> None:
+        """
+        Checks that every key fits in an integer key type. Float keys are not checked.
+
+        Args:
+            values (List[Union[int, float]]): The keys.
+            key_type (str): The key type.
+
+        Returns:
+            None
+
+        Raises:
+            ValueError: If a key is smaller or larger than the integer key type can hold.
+        """
+        if key_type not in KeyTransforms.INTEGER_RANGES or len(values) == 0:
+            return
+
+        low, high = KeyTransforms.INTEGER_RANGES[key_type]
+        for value in (min(values), max(values)):
+            if not low <= value <= high:
+                raise ValueError(f"Value {value} does not fit in key type {key_type!r}, which holds [{low}, {high}]")
+
+    @staticmethod
+    def typecode(key_type: str) -> str:
+        """
+        Looks up the array typecode of a key type.
+
+        Args:
+            key_type (str): The key type.
+
+        Returns:
+            str: The matching array typecode.
+        """
+        if key_type not in KeyTransforms.TYPECODES:
+            raise ValueError(f"Unknown key type {key_type!r}, expected one of {list(KeyTransforms.TYPECODES)}")
+        return KeyTransforms.TYPECODES[key_type]
+
+    @staticmethod
+    def _to_bits(values: List[Union[int, float]], key_type: str) -> memoryview:
+        """
+        Reinterprets typed keys as their raw unsigned 64-bit patterns.
+
+        Args:
+            values (List[Union[int, float]]): The keys to reinterpret.
+            key_type (str): The key type.
+
+        Returns:
+            memoryview: The bit patterns, viewed as unsigned 64-bit integers.
+        """
+        typed = array(KeyTransforms.typecode(key_type), values)
+        return memoryview(typed).cast('B').cast('Q')
@@ -0,0 +1,197 @@
+from collections import Counter
+from typing import Iterable, Iterator, List, Optional, Set
+from bucket_planner import BucketPlanner
+from radix_sort import RadixBuffers
+from sorting_utilities import SortingUtils
+
+
+class ModuloSortedList:
+
+    """
+    Sorted multiset of integers keeping the quotient/remainder buckets of modulo sort between updates.
+    """
+
+    # Fraction of the value range left free below and above the values when the buckets are rebuilt
+    HEADROOM = 4
+
+    def __init__(self, values: Iterable[int] = (), planner: Optional[BucketPlanner] = None):
+        """
+        Initializes the container.
+
+        Args:
+            values (Iterable[int]): The initial values.
+            planner (Optional[BucketPlanner]): The cost model choosing how every touched bucket is sorted.
+        """
+        self.planner = BucketPlanner() if planner is None else planner
+        self._radix_buffers = RadixBuffers()
+        self._buckets: List[List[int]] = []
+        self._unsorted: Set[int] = set()
+        self._min_value = 0
+        self._modulo_range = 1
+        self._length = 0
+        self._built_length = 0
+
+        self.add_many(values)
+
+    def __len__(self) -> int:
+        return self._length
+
+    def __iter__(self) -> Iterator[int]:
+        """
+        Iterates over the values in ascending order.
+
+        Returns:
+            Iterator[int]: The values, duplicates included.
+
+        Notes:
+            - Only the buckets touched since the last iteration are sorted again.
+        """
+        self._sort_buckets()
+
+        for index, bucket in enumerate(self._buckets):
+            if bucket:
+                bucket_base = self._min_value + index * self._modulo_range
+                yield from [bucket_base + modulo_val for modulo_val in bucket]
+
+    def __contains__(self, value: int) -> bool:
+        index, modulo_val = divmod(value - self._min_value, self._modulo_range)
+        return 0 <= index < len(self._buckets) and modulo_val in self._buckets[index]
+
+    @property
+    def modulo_range(self) -> int:
+        """
+        The width of the value range covered by every bucket.
+        """
+        return self._modulo_range
+
+    def add_many(self, values: Iterable[int]) -> None:
+        """
+        Adds a batch of values.
+
+        Args:
+            values (Iterable[int]): The values to add.
+
+        Returns:
+            None
+
+        Notes:
+            - Values falling in the current buckets cost one division each. The buckets are rebuilt, with a new
+              modulo_range, when the container has doubled in size since the last rebuild or when a value falls
+              below the covered range or far above it, so rebuilding stays proportional to the values added.
+        """
+        values = list(values)
+        if not values:
+            return
+
+        low, high = min(values), max(values)
+        total = self._length + len(values)
+
+        if not self._buckets or low < self._min_value or total > 2 * self._built_length:
+            self._rebuild(values)
+            return
+
+        # Values slightly above the covered range get new empty buckets
+        maximum_bucket = (high - self._min_value) // self._modulo_range
+        if maximum_bucket >= len(self._buckets):
+            if maximum_bucket >= 2 * len(self._buckets) + len(values):
+                self._rebuild(values)
+                return
+            self._buckets.extend([] for _ in range(maximum_bucket + 1 - len(self._buckets)))
+
+        self._distribute(values)
+
+    def remove_many(self, values: Iterable[int]) -> None:
+        """
+        Removes a batch of values, one occurrence per occurrence in the batch.
+
+        Args:
+            values (Iterable[int]): The values to remove.
+
+        Returns:
+            None
+
+        Notes:
+            - Removing keeps every bucket in order, so no bucket needs sorting afterwards.
+            - The buckets are rebuilt once the container shrinks to a quarter of its size at the last rebuild.
+        """
+        removals = Counter(values)
+
+        # Check the whole batch first so a missing value leaves the container untouched
+        for value, count in removals.items():
+            index, modulo_val = divmod(value - self._min_value, self._modulo_range)
+            if not 0 <= index < len(self._buckets) or self._buckets[index].count(modulo_val) < count:
+                raise ValueError(f"{value} is not in the container {count} time(s)")
+
+        for value, count in removals.items():
+            index, modulo_val = divmod(value - self._min_value, self._modulo_range)
+            bucket = self._buckets[index]
+            for _ in range(count):
+                bucket.remove(modulo_val)
+            self._length -= count
+
+        if self._length == 0:
+            self._buckets, self._unsorted, self._built_length = [], set(), 0
+        elif 4 * self._length < self._built_length:
+            self._rebuild([])
+
+    def _distribute(self, values: List[int]) -> None:
+        """
+        Appends values to the existing buckets and marks the buckets for sorting.
+
+        Args:
+            values (List[int]): The values to add, all inside the covered range.
+
+        Returns:
+            None
+        """
+        buckets, unsorted = self._buckets, self._unsorted
+        min_value, modulo_range = self._min_value, self._modulo_range
+
+        for num in values:
+            index, modulo_val = divmod(num - min_value, modulo_range)
+            buckets[index].append(modulo_val)
+            unsorted.add(index)
+
+        self._length += len(values)
+
+    def _sort_buckets(self) -> None:
+        """
+        Sorts the buckets touched since they were last sorted.
+
+        Returns:
+            None
+        """
+        for index in self._unsorted:
+            bucket = self._buckets[index]
+            if len(bucket) > 1:
+                bucket[:] = self.planner.sort_bucket(bucket, 0, self._radix_buffers)
+        self._unsorted.clear()
+
+    def _rebuild(self, values: List[int]) -> None:
+        """
+        Recomputes min_value and modulo_range for the current and new values, and distributes them again.
+
+        Args:
+            values (List[int]): The values being added.
+
+        Returns:
+            None
+        """
+        # Current values come out sorted, so only the buckets receiving new values need sorting again
+        current = list(self)
+        low = min(current[:1] + values)
+        high = max(current[-1:] + values)
+
+        headroom = (high - low) // ModuloSortedList.HEADROOM
+        total = len(current) + len(values)
+
+        self._min_value = low - headroom
+        self._modulo_range = SortingUtils.compute_modulo_range(self._min_value, high + headroom, total)
+        self._buckets = [[] for _ in range((high + headroom - self._min_value) // self._modulo_range + 1)]
+        self._unsorted = set()
+        self._length = 0
+        self._built_length = total
+
+        self._distribute(current)
+        self._unsorted.clear()
+        self._distribute(values)
@@ -1,25 +1,89 @@
-from typing import List, Optional
+from itertools import islice
+from typing import Dict, List, Optional, Tuple
 from counting_sort import CountingSortRadix
 
 
+class RadixBuffers:
+
+    """
+    Scratch space reused by consecutive radix sorts, so that digit passes do not allocate.
+    """
+
+    def __init__(self):
+        self.scratch: List[int] = []
+        self.counters: Dict[int, Tuple[List[int], List[int]]] = {}
+
+        # Number of digit passes run with these buffers
+        self.passes = 0
+
+    def buffer(self, length: int) -> List[int]:
+        """
+        Returns the scratch buffer, growing it to at least the given length if needed.
+
+        Args:
+            length (int): The number of elements to be sorted.
+
+        Returns:
+            List[int]: A buffer of at least length slots. Only the first length slots belong to the current sort.
+
+        Notes:
+            - A list is used rather than array('Q'), as element stores into an array are notably slower in
+              the scatter loop and a list also holds values wider than 64 bits.
+        """
+        if len(self.scratch) < length:
+            self.scratch = [0] * max(length, 2 * len(self.scratch))
+
+        return self.scratch
+
+    def counter(self, bits: int) -> List[int]:
+        """
+        Returns zeroed counters for a digit width, reusing the ones from previous passes.
+
+        Args:
+            bits (int): The width of the digit in bits.
+
+        Returns:
+            List[int]: 2 ** bits counters set to zero.
+        """
+        if bits not in self.counters:
+            zeros = [0] * (1 << bits)
+            self.counters[bits] = (list(zeros), zeros)
+
+        count, zeros = self.counters[bits]
+        count[:] = zeros
+        return count
+
+
 class RadixSort:
 
     """
     Implementation of radix sort, to be used as a sub-process in modulo sort
     """
 
+    # Digit widths, in bits, the radix sort can choose from
+    RADIX_BITS = (8, 11, 16)
+
     @staticmethod
-    def sorter(arr: List[int], maximum: Optional[int] = None) -> List[int]:
+    def sorter(arr: List[int], maximum: Optional[int] = None, radix_bits: Optional[int] = None,
+               buffers: Optional[RadixBuffers] = None) -> List[int]:
         """
         Performs radix sort on the given array of integers.
 
         Args:
-            arr (List[int]): The array of integers to be sorted.
+            arr (List[int]): The array of non-negative integers to be sorted.
             maximum (Optional[int]): The maximum value in the array. If not provided,
                                      it will be calculated.
+            radix_bits (Optional[int]): The width of every digit in bits. If not provided, it is chosen
+                                        from RADIX_BITS according to the array length and key range.
+            buffers (Optional[RadixBuffers]): Scratch buffers to reuse across calls. If not provided,
+                                              new ones are created for this call.
 
         Returns:
             List[int]: The sorted array.
+
+        Notes:
+            - Passes alternate between arr and the scratch buffer instead of copying back after every digit,
+              arr is written at most once more at the end.
         """
 
         if len(arr) == 0:
@@ -27,11 +91,52 @@ class RadixSort:
 
         # Find the maximum number to determine the number of digits
         max_num = max(arr) if maximum is None else maximum
+        if radix_bits is None:
+            radix_bits = RadixSort.choose_radix_bits(len(arr), max_num)
+
+        shifts = range(0, max_num.bit_length(), radix_bits)
+        if not shifts:
+            return arr
+
+        if buffers is None:
+            buffers = RadixBuffers()
+        length = len(arr)
+        source, target = arr, buffers.buffer(length)
+        buffers.passes += len(shifts)
 
         # Perform counting sort for each digit, starting from the least significant digit
-        exp = 1
-        while max_num // exp > 0:
-            CountingSortRadix.sorter(arr, exp)
-            exp *= 10
+        for shift in shifts:
+            CountingSortRadix.scatter_binary(source, target, length, shift, radix_bits, buffers.counter(radix_bits))
+
+            # The array and the scratch buffer swap roles instead of copying the output back
+            source, target = target, source
+
+        # After an odd number of passes the sorted values sit in the scratch buffer
+        if source is not arr:
+            arr[:] = islice(source, length)
+
+        return arr
+
+    @staticmethod
+    def choose_radix_bits(length: int, maximum: int) -> int:
+        """
+        Chooses the digit width minimizing the work of a radix sort.
+
+        Args:
+            length (int): The number of elements to be sorted.
+            maximum (int): The maximum value to be sorted.
+
+        Returns:
+            int: The digit width in bits, taken from RADIX_BITS.
+
+        Notes:
+            - Every pass costs one visit per element plus one per counter, so wide digits only pay off when
+              they save passes on long arrays.
+        """
+        key_bits = max(1, maximum.bit_length())
+
+        def cost(bits: int) -> int:
+            passes = -(-key_bits // bits)
+            return passes * (2 * length + (1 << bits))
 
-        return arr
\ No newline at end of file
+        return min(RadixSort.RADIX_BITS, key=cost)
@@ -0,0 +1,133 @@
+from array import array
+from collections import Counter
+from operator import sub
+from time import perf_counter
+from typing import Any, Dict, List, Mapping, Optional, Union
+
+
+class SortStats:
+
+    """
+    Instrumentation of a single modulo sort call: phase timings, bucket statistics and strategy choices.
+    """
+
+    def __init__(self):
+        self.length = 0
+        self.route: Optional[str] = None
+        self.modulo_range: Optional[int] = None
+        self.phases: Dict[str, float] = {}
+        self.bucket_count: Optional[int] = None
+        self.nonempty_buckets: Optional[int] = None
+        self.largest_bucket: Optional[int] = None
+        self.bucket_sizes: Dict[int, int] = {}
+        self.radix_passes = 0
+        self.runs: Optional[int] = None
+        self.outliers: Optional[int] = None
+        self.shard_sizes: List[int] = []
+        self.strategies: Dict[str, Dict[str, float]] = {}
+        self._last = 0.0
+
+    def start(self, length: int) -> None:
+        """
+        Starts recording a sort call, discarding anything recorded before.
+
+        Args:
+            length (int): The number of elements to be sorted.
+
+        Returns:
+            None
+        """
+        self.__init__()
+        self.length = length
+        self._last = perf_counter()
+
+    def lap(self, phase: str) -> None:
+        """
+        Adds the time elapsed since the previous lap, or since the start, to a phase.
+
+        Args:
+            phase (str): The name of the phase that just ended.
+
+        Returns:
+            None
+        """
+        now = perf_counter()
+        self.phases[phase] = self.phases.get(phase, 0.0) + now - self._last
+        self._last = now
+
+    def record_buckets(self, bucket_offsets: Union[array, List[int]]) -> None:
+        """
+        Records the bucket statistics from the bucket offsets of a sort.
+
+        Args:
+            bucket_offsets (Union[array, List[int]]): The offsets of the buckets, bucket i holding the elements
+                                                      in [offsets[i], offsets[i + 1]).
+
+        Returns:
+            None
+
+        Notes:
+            - The time spent recording is not added to any phase.
+        """
+        self.record_bucket_sizes(Counter(map(sub, bucket_offsets[1:], bucket_offsets[:-1])))
+
+    def record_bucket_sizes(self, size_counts: Mapping[int, int]) -> None:
+        """
+        Records the bucket statistics from the number of buckets of every size.
+
+        Args:
+            size_counts (Mapping[int, int]): The number of buckets holding every number of elements, empty
+                                             buckets included under size 0.
+
+        Returns:
+            None
+
+        Notes:
+            - The histogram groups bucket sizes by powers of two: key k counts the non-empty buckets holding
+              from k to 2k - 1 elements.
+            - The time spent recording is not added to any phase.
+        """
+        self.bucket_count = sum(size_counts.values())
+        self.nonempty_buckets = self.bucket_count - size_counts.get(0, 0)
+        self.largest_bucket = max((size for size, count in size_counts.items() if count), default=0)
+
+        histogram = Counter()
+        for size, count in size_counts.items():
+            if size and count:
+                histogram[1 << (size.bit_length() - 1)] += count
+        self.bucket_sizes = dict(sorted(histogram.items()))
+        self._last = perf_counter()
+
+    @property
+    def total_seconds(self) -> float:
+        """
+        The time spent in all recorded phases.
+        """
+        return sum(self.phases.values())
+
+    def to_dict(self) -> Dict[str, Any]:
+        """
+        Exports the recorded statistics.
+
+        Returns:
+            Dict[str, Any]: The statistics as plain dicts, numbers and strings. Bucket statistics are None when
+                            the array did not go through buckets sorted in the calling process, runs and
+                            outliers are None when it did not take a presorted route, and shard sizes are
+                            only filled by the parallel route.
+        """
+        return {
+            'length': self.length,
+            'route': self.route,
+            'modulo_range': self.modulo_range,
+            'total_seconds': self.total_seconds,
+            'phases': dict(self.phases),
+            'bucket_count': self.bucket_count,
+            'nonempty_buckets': self.nonempty_buckets,
+            'largest_bucket': self.largest_bucket,
+            'bucket_sizes': dict(self.bucket_sizes),
+            'radix_passes': self.radix_passes,
+            'runs': self.runs,
+            'outliers': self.outliers,
+            'shard_sizes': list(self.shard_sizes),
+            'strategies': {strategy: dict(counts) for strategy, counts in self.strategies.items()},
+        }
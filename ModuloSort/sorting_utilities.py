@@ -1,5 +1,9 @@
-from typing import Dict, List, Tuple, Union
-from collections import defaultdict
+from typing import Dict, List, Optional, Tuple, Union
+from collections import Counter
+from array import array
+from bisect import bisect_left, bisect_right
+from itertools import compress, islice
+from operator import gt, lt
 
 class SortingUtils:
 
@@ -41,79 +45,228 @@ class SortingUtils:
         return arr
 
     @staticmethod
-    def count_duplicates(arr: List[int]) -> Dict[int, Union[int, List[int]]]:
+    def insertion_sort(arr: List[int]) -> List[int]:
         """
-        Tracks occurrences of elements in the array. On the first occurrence of an element, its index is stored.
-        On subsequent occurrences, the element is moved to a defaultdict that maps elements to lists of their duplicates.
+        Sorts a short array of integers in place with insertion sort.
+
+        Args:
+            arr (List[int]): The array of integers to sort.
+
+        Returns:
+            List[int]: The sorted array in ascending order.
+        """
+        for i in range(1, len(arr)):
+            key = arr[i]
+            # Move greater elements of arr[0..i-1] one position ahead of their current position
+            j = i - 1
+            while j >= 0 and key < arr[j]:
+                arr[j + 1] = arr[j]
+                j -= 1
+            arr[j + 1] = key
+        return arr
+
+    @staticmethod
+    def count_duplicates(arr: List[int]) -> Dict[int, int]:
+        """
+        Counts the occurrences of every element in the array in a single pass.
 
         Args:
             arr (List[int]): The array of integers to process.
 
         Returns:
-            Dict[int, List[int]]: A dictionary where keys are the elements that have duplicates and values
-                                   are lists of those elements, effectively storing duplicates after the first occurrence.
+            Dict[int, int]: A dictionary mapping every distinct element to its multiplicity. Duplicates are
+                            tracked as integers, so repeated values are never copied.
         """
-        count_dict = {}
-        duplicates_dict = defaultdict(list)
+        return Counter(arr)
 
-        for k, element in enumerate(arr):
-            original_index = count_dict.get(element)
+    @staticmethod
+    def append_duplicates(to_append: int, count: int, sorted_arr: List[int]) -> None:
+        """
+        Appends an element to a sorted array as many times as it occurs in the original array.
 
-            if type(original_index) == int:
-                duplicates_dict[element].append(arr[original_index])
+        Args:
+            to_append (int): The element to append.
+            count (int): The multiplicity of the element.
+            sorted_arr (List[int]): The list to which the element will be appended.
 
-                duplicates_dict[element].append(element)
+        Returns:
+            None
+        """
+        # Repeated elements are emitted by bulk repetition
+        if count > 1:
+            sorted_arr.extend([to_append] * count)
+        else:
+            sorted_arr.append(to_append)
 
-                count_dict[element] = ""
+    @staticmethod
+    def compute_modulo_range(min_value: int, max_value: int, length: int) -> int:
+        """
+        Computes the bucket width used by modulo sort, using integer arithmetic only.
 
-            elif original_index == "":
-                duplicates_dict[element].append(element)
-            else:
-                # Track the first occurrence with a simple index
-                count_dict[element] = k
+        Args:
+            min_value (int): The minimum value in the array.
+            max_value (int): The maximum value in the array.
+            length (int): The number of elements in the array.
 
-        return duplicates_dict
+        Returns:
+            int: The value of round((max_value - min_value) / length) + 1, rounding halves up.
+
+        Notes:
+            - Unlike float division, the result stays exact for values above 2 ** 53.
+        """
+        return (2 * (max_value - min_value) + length) // (2 * length) + 1
 
     @staticmethod
-    def append_duplicates(duplicates_dict: Dict[int, List[int]], to_append: int, sorted_arr: List[int]) -> None:
+    def allocate_buffer(length: int, max_value: int) -> Union[array, List[int]]:
         """
-        Appends duplicates of a given element to a sorted array, if available. Otherwise simply appends the element
+        Preallocates a zero-filled buffer able to hold non-negative integers up to max_value.
 
         Args:
-            duplicates_dict (Dict[int, List[int]]): A dictionary containing elements as keys and a list of duplicates as values.
-            to_append (int): The element to append duplicates for.
-            sorted_arr (List[int]): The list to which duplicates will be appended.
+            length (int): The number of slots in the buffer.
+            max_value (int): The largest value that will be stored in the buffer.
 
         Returns:
-            None
+            Union[array, List[int]]: A compact array('Q') when values fit in 64 bits, a plain list otherwise.
         """
-        # Check if the element has duplicates to append
-        if to_append in duplicates_dict:
-            sorted_arr.extend(duplicates_dict[to_append])
-        else:
-            sorted_arr.append(to_append)
+        if max_value < 1 << 64:
+            return array('Q', bytes(8 * length))
+        return [0] * length
+
+    @staticmethod
+    def count_descents(arr: List[int]) -> int:
+        """
+        Counts the positions where an element is smaller than the one before it.
+
+        Args:
+            arr (List[int]): The array of integers to probe.
+
+        Returns:
+            int: The number of descents. The array is made of descents + 1 ascending runs.
 
+        Notes:
+            - The comparisons run at C speed, so probing costs about as much as a min/max scan.
+        """
+        return sum(map(lt, islice(arr, 1, None), arr))
 
     @staticmethod
-    def find_min_and_max(arr: List[int]) -> Tuple[int, int]:
+    def count_ascents(arr: List[int]) -> int:
+        """
+        Counts the positions where an element is greater than the one before it.
 
+        Args:
+            arr (List[int]): The array of integers to probe.
+
+        Returns:
+            int: The number of ascents. The array is made of ascents + 1 descending runs.
+        """
+        return sum(map(gt, islice(arr, 1, None), arr))
+
+    @staticmethod
+    def run_starts(arr: List[int]) -> List[int]:
+        """
+        Finds where every ascending run of an array starts.
+
+        Args:
+            arr (List[int]): The array of integers.
+
+        Returns:
+            List[int]: The start position of every non-decreasing run, beginning with 0.
+        """
+        return [0] + list(compress(range(1, len(arr)), map(lt, islice(arr, 1, None), arr)))
+
+    @staticmethod
+    def gallop_merge(left: List[int], right: List[int]) -> List[int]:
+        """
+        Merges two sorted arrays, copying whole stretches found by binary search instead of single elements.
+
+        Args:
+            left (List[int]): The first sorted array. Its elements come first among equal ones.
+            right (List[int]): The second sorted array.
+
+        Returns:
+            List[int]: The merged and sorted array.
+        """
+        merged = []
+        left_index, right_index = 0, 0
+
+        while left_index < len(left) and right_index < len(right):
+            if left[left_index] <= right[right_index]:
+                # Take every left element not greater than the current right one
+                end = bisect_right(left, right[right_index], left_index)
+                merged.extend(left[left_index:end])
+                left_index = end
+            else:
+                # Take every right element smaller than the current left one
+                end = bisect_left(right, left[left_index], right_index)
+                merged.extend(right[right_index:end])
+                right_index = end
+
+        # Collect the remaining elements from both arrays
+        merged.extend(left[left_index:])
+        merged.extend(right[right_index:])
+
+        return merged
+
+    @staticmethod
+    def split_outliers(arr: List[int], max_outliers: int) -> Optional[Tuple[List[int], List[int]]]:
+        """
+        Splits a nearly sorted array into a sorted subsequence and the few elements that break the order.
+
+        Args:
+            arr (List[int]): The array of integers.
+            max_outliers (int): The number of outliers after which splitting is abandoned.
+
+        Returns:
+            Optional[Tuple[List[int], List[int]]]: The sorted subsequence and the unsorted outliers, or None if the
+                                                   array is too far from sorted.
+
+        Notes:
+            - Both elements around a descent are taken out, so a value moved far from its place leaves along with
+              its neighbour. Only the joins between ascending runs are inspected, and the kept stretches are
+              copied as whole slices.
+        """
+        starts = SortingUtils.run_starts(arr)
+        pieces, outliers = [], []
+
+        for start, end in zip(starts, starts[1:] + [len(arr)]):
+
+            # Trim the previous stretch and the current run until they join in order
+            while pieces and start < end and arr[pieces[-1][1] - 1] > arr[start]:
+                previous = pieces[-1]
+                previous[1] -= 1
+                outliers.append(arr[previous[1]])
+                outliers.append(arr[start])
+                start += 1
+                if previous[0] == previous[1]:
+                    pieces.pop()
+
+            if len(outliers) > max_outliers:
+                return None
+            if start < end:
+                pieces.append([start, end])
+
+        main = []
+        for start, end in pieces:
+            main.extend(arr[start:end])
+
+        return main, outliers
+
+    @staticmethod
+    def merge_runs(arr: List[int], starts: List[int]) -> List[int]:
         """
-        Finds the minimum and maximum values in an array.
+        Sorts an array made of a few ascending runs by merging neighbouring runs pairwise.
 
         Args:
-            arr (List[int]): The array of integers to find the minimum and maximum from.
+            arr (List[int]): The array of integers.
+            starts (List[int]): The start position of every ascending run, as returned by run_starts.
 
         Returns:
-            Tuple[int, int]: A tuple containing the minimum and maximum values in the array.
+            List[int]: The sorted array.
         """
-        # Initialize min and max with the first element
-        minimum, maximum = arr[0], arr[0]
+        runs = [arr[start:end] for start, end in zip(starts, starts[1:] + [len(arr)])]
 
-        for num in arr[1:]:
-            # Update minimum and maximum values as needed
-            if num < minimum:
-                minimum = num
-            elif num > maximum:
-                maximum = num
+        while len(runs) > 1:
+            runs = [SortingUtils.gallop_merge(runs[i], runs[i + 1]) if i + 1 < len(runs) else runs[i]
+                    for i in range(0, len(runs), 2)]
 
-        return minimum, maximum
\ No newline at end of file
+        return runs[0]
@@ -0,0 +1,326 @@
+import math
+import random
+import struct
+from array import array
+from itertools import chain
+from typing import Dict, List
+
+import pytest
+
+import modulo_sort
+from external_sort import ExternalModuloSort
+from key_transforms import KeyTransforms
+from modulo_sort import ModuloSort
+from modulo_sorted_list import ModuloSortedList
+
+try:
+    import numpy as np
+except ImportError:
+    np = None
+
+# Large enough for the NumPy backend and the vectorized selection and grouping paths
+LARGE = ModuloSort.NUMPY_THRESHOLD + 2000
+
+
+def make_cases(size: int, seed: int) -> Dict[str, List[int]]:
+    """
+    Builds the fuzzed inputs of one size: edge cases, value ranges and presorted shapes.
+
+    Args:
+        size (int): The number of values of every input that is not an edge case by its length.
+        seed (int): The seed of the random generator.
+
+    Returns:
+        Dict[str, List[int]]: The inputs, by name.
+    """
+    rng = random.Random(seed)
+    cases = {
+        'empty': [],
+        'one': [rng.randrange(-10 ** 6, 10 ** 6)],
+        'two_equal': [7, 7],
+        'all_equal': [-5] * size,
+        'negatives': [rng.randrange(-10 ** 9, 0) for _ in range(size)],
+        'mixed_signs': [rng.randrange(-10 ** 6, 10 ** 6) for _ in range(size)],
+        'duplicates': [rng.randrange(-50, 50) for _ in range(size)],
+        'wide': [rng.randrange(-10 ** 15, 10 ** 15) for _ in range(size)],
+        'int64_extremes': [rng.choice((-(1 << 63), (1 << 63) - 1, 0, -1)) for _ in range(size)],
+        'uint64_high': [rng.randrange(1 << 63, 1 << 64) for _ in range(size)],
+        'beyond_int64': [rng.randrange(-(1 << 70), 1 << 70) for _ in range(size)],
+        'sorted': sorted(rng.randrange(10 ** 6) for _ in range(size)),
+        'reversed': sorted((rng.randrange(10 ** 6) for _ in range(size)), reverse=True),
+        'runs': list(chain.from_iterable(sorted(rng.randrange(-10 ** 6, 10 ** 6) for _ in range(size // 4))
+                                         for _ in range(4))),
+        'outliers': [value if rng.random() > 0.01 else -value for value in range(size)],
+        'skewed': [int(rng.expovariate(1e-6)) for _ in range(size)],
+    }
+    return cases
+
+
+SMALL_CASES = make_cases(300, 1)
+LARGE_CASES = make_cases(LARGE, 2)
+ALL_CASES = [pytest.param(arr, id=f'{name}-{len(arr)}')
+             for name, arr in chain(SMALL_CASES.items(), LARGE_CASES.items())]
+INT64_CASES = [pytest.param(arr, id=f'{name}-{len(arr)}')
+               for name, arr in chain(SMALL_CASES.items(), LARGE_CASES.items())
+               if all(-(1 << 63) <= value < 1 << 63 for value in arr)]
+
+
+@pytest.fixture(params=['numpy', 'python'])
+def backend(request, monkeypatch) -> str:
+    """
+    Runs a test with the NumPy backend, when installed, and with the pure-Python paths.
+    """
+    if request.param == 'numpy' and np is None:
+        pytest.skip('NumPy is not installed')
+    if request.param == 'python':
+        monkeypatch.setattr(modulo_sort, 'np', None)
+    return request.param
+
+
+@pytest.mark.parametrize('arr', ALL_CASES)
+def test_sorter(arr, backend):
+    assert ModuloSort.sorter(list(arr)) == sorted(arr)
+    assert ModuloSort.sorter(list(arr), adaptive=True) == sorted(arr)
+
+
+@pytest.mark.parametrize('arr', ALL_CASES)
+def test_sorter_with_key_is_stable(arr, backend):
+    items = [(value, position) for position, value in enumerate(arr)]
+    assert ModuloSort.sorter(items, key=lambda item: item[0]) == sorted(items, key=lambda item: item[0])
+
+
+def test_sorter_parallel():
+    rng = random.Random(3)
+    arr = [rng.randrange(-10 ** 12, 10 ** 12) for _ in range(ModuloSort.PARALLEL_THRESHOLD + 1000)]
+    assert ModuloSort.sorter(list(arr), workers=2) == sorted(arr)
+
+
+@pytest.mark.parametrize('arr', ALL_CASES)
+def test_sorter_inplace(arr, backend):
+    values = list(arr)
+    ModuloSort.sorter_inplace(values)
+    assert values == sorted(arr)
+
+
+@pytest.mark.parametrize('arr', INT64_CASES)
+def test_sorter_inplace_array(arr):
+    values = array('q', arr)
+    ModuloSort.sorter_inplace(values)
+    assert values.tolist() == sorted(arr)
+
+
+@pytest.mark.parametrize('arr', ALL_CASES)
+def test_sorter_typed(arr, backend):
+    assert ModuloSort.sorter_typed(list(arr)) == sorted(arr)
+
+
+def test_sorter_typed_floats(backend):
+    rng = random.Random(4)
+    arr = [rng.uniform(-1e300, 1e300) for _ in range(LARGE)] + [0.0, -0.0, math.inf, -math.inf, 1e-320, -1e-320]
+    assert ModuloSort.sorter_typed(list(arr)) == sorted(arr)
+
+
+@pytest.mark.parametrize('arr, key_type', [([-1, 1 << 63], 'int64'), ([-1, 5], 'uint64'), ([1 << 64], 'uint64')])
+def test_sorter_typed_out_of_range(arr, key_type, backend):
+    with pytest.raises(ValueError, match=key_type):
+        ModuloSort.sorter_typed(arr, key_type)
+
+
+@pytest.mark.skipif(np is None, reason='NumPy is not installed')
+@pytest.mark.parametrize('arr', INT64_CASES)
+def test_sorter_np_and_argsort_np(arr):
+    keys = np.array(arr, dtype=np.int64)
+    assert np.array_equal(ModuloSort.sorter_np(keys), np.sort(keys, kind='stable'))
+    assert np.array_equal(ModuloSort.argsort_np(keys), np.argsort(keys, kind='stable'))
+
+
+@pytest.mark.skipif(np is None, reason='NumPy is not installed')
+@pytest.mark.parametrize('dtype', ['uint64', 'int32', 'uint8', 'float64', 'float32'])
+def test_sorter_np_dtypes(dtype):
+    rng = np.random.default_rng(5)
+    if np.dtype(dtype).kind == 'f':
+        keys = (rng.standard_normal(LARGE) * 1e6).astype(dtype)
+    else:
+        info = np.iinfo(dtype)
+        keys = rng.integers(info.min, info.max, size=LARGE, dtype=dtype, endpoint=True)
+    for arr in (keys, keys[:1], keys[:0], np.full(100, keys[0])):
+        assert np.array_equal(ModuloSort.sorter_np(arr), np.sort(arr, kind='stable'))
+        assert np.array_equal(ModuloSort.argsort_np(arr), np.argsort(arr, kind='stable'))
+
+
+@pytest.mark.parametrize('arr', ALL_CASES)
+def test_argsort(arr, backend):
+    assert ModuloSort.argsort(list(arr)) == sorted(range(len(arr)), key=arr.__getitem__)
+
+
+@pytest.mark.parametrize('arr', ALL_CASES)
+def test_argsort_columns(arr, backend):
+    rng = random.Random(len(arr))
+    columns = [[value % 3 for value in arr], list(arr), [rng.randrange(-(1 << 40), 1 << 40) for _ in arr]]
+    expected = sorted(range(len(arr)), key=lambda row: tuple(column[row] for column in columns))
+    assert ModuloSort.argsort_columns(columns) == expected
+    assert ModuloSort.argsort_columns([list(arr)]) == sorted(range(len(arr)), key=arr.__getitem__)
+
+
+def test_argsort_columns_invalid():
+    with pytest.raises(ValueError):
+        ModuloSort.argsort_columns([])
+    with pytest.raises(ValueError):
+        ModuloSort.argsort_columns([[1, 2], [1]])
+
+
+@pytest.mark.parametrize('arr', ALL_CASES)
+def test_select(arr, backend):
+    expected = sorted(arr)
+    for k in sorted({0, len(arr) // 3, len(arr) // 2, len(arr) - 1}):
+        if 0 <= k < len(arr):
+            assert ModuloSort.select(arr, k) == expected[k]
+    with pytest.raises(IndexError):
+        ModuloSort.select(arr, len(arr))
+
+
+@pytest.mark.parametrize('arr', ALL_CASES)
+def test_smallest(arr, backend):
+    expected = sorted(arr)
+    for k in (0, 1, len(arr) // 2, len(arr) - 1, len(arr), len(arr) + 1):
+        assert ModuloSort.smallest(arr, k) == expected[:max(k, 0)]
+
+
+@pytest.mark.parametrize('arr', ALL_CASES)
+def test_iter_sorted(arr, backend):
+    assert list(ModuloSort.iter_sorted(arr)) == sorted(arr)
+
+    chunks = list(ModuloSort.iter_sorted(arr, chunk_size=100))
+    assert list(chain.from_iterable(chunks)) == sorted(arr)
+    assert all(len(chunk) >= 100 for chunk in chunks[:-1])
+
+
+@pytest.mark.parametrize('lengths', [[], [0], [0, 0, 5], [1] * 50, [3, 0, 200, 7, 1], [2000] * 7])
+def test_sort_many(lengths, backend):
+    rng = random.Random(sum(lengths))
+    arrays = [[rng.randrange(-10 ** 9, 10 ** 9) for _ in range(length)] for length in lengths]
+    assert ModuloSort.sort_many(arrays) == [sorted(arr) for arr in arrays]
+
+
+@pytest.mark.parametrize('arr', ALL_CASES)
+def test_sort_many_cases(arr, backend):
+    arrays = [arr, arr[:len(arr) // 2], [], arr[::-1]]
+    assert ModuloSort.sort_many(arrays) == [sorted(values) for values in arrays]
+
+
+@pytest.mark.parametrize('arr', ALL_CASES)
+@pytest.mark.parametrize('shard_count', [1, 3, 200])
+def test_merge_sorted(arr, shard_count):
+    rng = random.Random(shard_count)
+    shards = [[] for _ in range(shard_count)]
+    for value in arr:
+        shards[rng.randrange(shard_count)].append(value)
+    shards = [sorted(shard) for shard in shards]
+    assert ModuloSort.merge_sorted(shards) == sorted(arr)
+
+
+def test_merge_sorted_empty_shards():
+    assert ModuloSort.merge_sorted([]) == []
+    assert ModuloSort.merge_sorted([[], []]) == []
+    assert ModuloSort.merge_sorted([[], [-(1 << 70), 3], [], [1 << 70]]) == [-(1 << 70), 3, 1 << 70]
+
+
+@pytest.mark.parametrize('arr', ALL_CASES)
+def test_modulo_sorted_list(arr):
+    rng = random.Random(len(arr))
+    values = list(arr)
+    rng.shuffle(values)
+
+    container = ModuloSortedList(values[:len(values) // 3])
+    expected = sorted(values[:len(values) // 3])
+    assert list(container) == expected
+
+    # Batches drifting below and far above the current range force rebuilds
+    for batch in (values[len(values) // 3:], [min(values, default=0) - 1000], [max(values, default=0) * 4 + 10]):
+        container.add_many(batch)
+        expected = sorted(expected + batch)
+        assert list(container) == expected
+        assert len(container) == len(expected)
+
+    removed = rng.sample(expected, len(expected) * 4 // 5)
+    container.remove_many(removed)
+    for value in removed:
+        expected.remove(value)
+    assert list(container) == expected
+    assert all(value in container for value in expected[:50])
+
+    with pytest.raises(ValueError):
+        container.remove_many([max(expected, default=0) + 1])
+    assert list(container) == expected
+
+
+@pytest.mark.parametrize('arr', INT64_CASES)
+def test_external_sorter(arr, tmp_path, monkeypatch):
+    # Tiny chunks and budget make every large input go through partition files, recursively for skewed ones
+    monkeypatch.setattr(ExternalModuloSort, 'READ_CHUNK', 256)
+    input_path, output_path = tmp_path / 'input.bin', tmp_path / 'output.bin'
+    with open(input_path, 'wb') as input_file:
+        array('q', arr).tofile(input_file)
+
+    count = ExternalModuloSort.sorter(str(input_path), str(output_path), memory_limit=256 * 100,
+                                      temp_dir=str(tmp_path))
+
+    output = array('q')
+    output.frombytes(output_path.read_bytes())
+    assert count == len(arr)
+    assert output.tolist() == sorted(arr)
+
+
+def float_bits(value: float) -> int:
+    """
+    Returns the raw bit pattern of a float, so that NaNs and signed zeros can be compared.
+    """
+    return struct.unpack('<Q', struct.pack('<d', value))[0]
+
+
+@pytest.mark.parametrize('key_type', ['int64', 'uint64'])
+def test_key_transforms_round_trip_integers(key_type):
+    rng = random.Random(6)
+    low, high = KeyTransforms.INTEGER_RANGES[key_type]
+    values = [low, high, low + 1, high - 1] + [rng.randint(low, high) for _ in range(1000)]
+
+    keys = KeyTransforms.encode(values, key_type)
+    assert all(0 <= key < 1 << 64 for key in keys)
+    assert KeyTransforms.decode(keys, key_type) == values
+    assert sorted(range(len(values)), key=keys.__getitem__) == sorted(range(len(values)), key=values.__getitem__)
+    assert KeyTransforms.encode([], key_type) == []
+
+    with pytest.raises(ValueError):
+        KeyTransforms.encode([high + 1], key_type)
+
+
+def test_key_transforms_round_trip_floats():
+    rng = random.Random(7)
+    values = [0.0, -0.0, math.inf, -math.inf, 5e-324, -5e-324, 1.7976931348623157e308, -1.7976931348623157e308]
+    values += [rng.uniform(-1e10, 1e10) for _ in range(1000)]
+    specials = [math.nan, -math.nan]
+
+    keys = KeyTransforms.encode(values + specials, 'float64')
+    decoded = KeyTransforms.decode(keys, 'float64')
+    assert [float_bits(value) for value in decoded] == [float_bits(value) for value in values + specials]
+
+    # Ordering matches the floats, with -0.0 before 0.0
+    ordered = [value for _, value in sorted(zip(keys, values))]
+    assert ordered == sorted(values)
+    assert keys[1] < keys[0]
+
+
+@pytest.mark.skipif(np is None, reason='NumPy is not installed')
+def test_key_transforms_encode_np_matches_encode():
+    rng = np.random.default_rng(8)
+    floats = np.concatenate([rng.standard_normal(1000) * 1e100, [0.0, -0.0, np.inf, -np.inf]])
+    ints = rng.integers(-(1 << 63), (1 << 63) - 1, size=1000, dtype=np.int64, endpoint=True)
+
+    assert KeyTransforms.encode_np(floats).tolist() == KeyTransforms.encode(floats.tolist(), 'float64')
+    assert KeyTransforms.encode_np(ints).tolist() == KeyTransforms.encode(ints.tolist(), 'int64')
+
+
+@pytest.mark.parametrize('values, key_type', [([], 'uint64'), ([1, 2], 'uint64'), ([-1, 2], 'int64'),
+                                              ([1, 2.5], 'float64'), ([-1, 1 << 63], None), ([1 << 64], None)])
+def test_key_transforms_infer_key_type(values, key_type):
+    assert KeyTransforms.infer_key_type(values) == key_type
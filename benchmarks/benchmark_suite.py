@@ -0,0 +1,257 @@
+from modulo_sort import ModuloSort
+from merge_sort import MergeSort
+from bucket_sort import BucketSort
+from radix_sort import RadixSort
+from benchmarks import SortingEvaluator
+import numpy as np
+import argparse
+import functools
+import gc
+import json
+import platform
+import statistics
+import sys
+import time
+import tracemalloc
+from typing import Callable, List, Dict, Any, Optional
+
+
+DEFAULT_ALGORITHMS = {
+    'modulo_sort': ModuloSort.sorter,
+    'radix_sort': RadixSort.sorter,
+    'radix_bucket_sort': BucketSort.sorter,
+    'merge_sort': MergeSort.sorter,
+    'builtin_sorted': sorted,
+    'numpy_sort': lambda arr: np.sort(np.asarray(arr)),
+}
+
+
+class BenchmarkSuite:
+    def __init__(self, sorting_algorithms: Dict[str, Callable[[List[Any]], Any]] = None, seed: int = 0,
+                 warmup: int = 1, repeats: int = 5, track_memory: bool = True, cache_dir: Optional[str] = None):
+        """
+        Initializes a reproducible benchmark suite.
+
+        :param sorting_algorithms: A dictionary of algorithm names and sorting functions. Defaults to DEFAULT_ALGORITHMS.
+        :param seed: Seed of the random generators, so that every run sorts the same inputs.
+        :param warmup: Number of untimed runs of every algorithm before timing it.
+        :param repeats: Number of timed runs of every algorithm, summarized by their median and interquartile range.
+        :param track_memory: Whether to run every algorithm once more under tracemalloc to record its peak memory.
+        :param cache_dir: Directory where generated inputs are cached as .npy files, or None to generate them every time.
+        """
+        self.sorting_algorithms = DEFAULT_ALGORITHMS if sorting_algorithms is None else sorting_algorithms
+        self.seed = seed
+        self.warmup = warmup
+        self.repeats = repeats
+        self.track_memory = track_memory
+        self.cache_dir = cache_dir
+        self.results: Dict[str, Dict[str, Any]] = {}
+
+    @staticmethod
+    def case_key(name: str, distribution: str, size: int, range_min: int, range_max: int) -> str:
+        """
+        Builds the key identifying a benchmark case in results and baselines.
+
+        :return: A key such as 'modulo_sort/uniform/10000/10-1000000'.
+        """
+        return f"{name}/{distribution}/{size}/{range_min}-{range_max}"
+
+    def generate(self, size: int, distribution: str, range_min: int, range_max: int) -> List[int]:
+        """
+        Generates a benchmark input from the suite's seed, so that the same case always gives the same input.
+
+        :return: The generated array of integers.
+        """
+        return SortingEvaluator.generate_large_random_array(size, distribution, True, range_min, range_max,
+                                                           seed=self.seed, cache_dir=self.cache_dir)
+
+    def measure(self, algorithm: Callable[[List[Any]], Any], arr: List[int]) -> Dict[str, Any]:
+        """
+        Times an algorithm on copies of an array after warming it up, and measures its peak memory in a separate run.
+
+        :param algorithm: The sorting function to measure.
+        :param arr: The array to be sorted (a copy is used for every run).
+        :return: Median, interquartile range, minimum and maximum time in seconds, throughput in elements per second
+                 and peak traced memory in bytes.
+        """
+        for _ in range(self.warmup):
+            algorithm(arr.copy())
+
+        times = []
+        for _ in range(self.repeats):
+            arr_copy = arr.copy()
+            gc.collect()
+            start_time = time.perf_counter()
+            algorithm(arr_copy)
+            times.append(time.perf_counter() - start_time)
+
+        median = statistics.median(times)
+        if len(times) > 1:
+            first_quartile, _, third_quartile = statistics.quantiles(times, n=4)
+        else:
+            first_quartile = third_quartile = median
+
+        result = {
+            'median_time': median,
+            'iqr_time': third_quartile - first_quartile,
+            'min_time': min(times),
+            'max_time': max(times),
+            'elements_per_second': len(arr) / median if median > 0 else float('inf'),
+            'peak_memory': None,
+        }
+
+        if self.track_memory:
+            arr_copy = arr.copy()
+            gc.collect()
+            tracemalloc.start()
+            try:
+                algorithm(arr_copy)
+                result['peak_memory'] = tracemalloc.get_traced_memory()[1]
+            finally:
+                tracemalloc.stop()
+
+        return result
+
+    def run(self, sizes: List[int] = None, distributions: List[str] = None,
+            ranges: List[tuple] = None) -> Dict[str, Dict[str, Any]]:
+        """
+        Runs every algorithm on every combination of size, distribution and range.
+
+        :param sizes: List of sizes for the arrays.
+        :param distributions: List of distribution types.
+        :param ranges: List of (range_min, range_max) tuples.
+        :return: The results, keyed by case_key. Algorithms that fail or return an unsorted array get an 'error' entry.
+        """
+        if sizes is None:
+            sizes = [1000, 10000, 100000]
+        if distributions is None:
+            distributions = ['uniform', 'shuffle', 'normal', 'exponential', 'almost_sorted', 'high_duplicates']
+        if ranges is None:
+            ranges = [(10, 10 ** 6)]
+
+        for size in sizes:
+            for distribution in distributions:
+                for range_min, range_max in ranges:
+                    arr = self.generate(size, distribution, range_min, range_max)
+                    expected_sorted = sorted(arr)
+
+                    for name, algorithm in self.sorting_algorithms.items():
+                        key = self.case_key(name, distribution, size, range_min, range_max)
+                        print(f"Benchmarking {key}")
+                        try:
+                            sorted_arr = algorithm(arr.copy())
+                            assert list(sorted_arr) == expected_sorted, f"{name} did not sort array correctly"
+                            result = self.measure(algorithm, arr)
+                            result['error'] = None
+                        except Exception as e:
+                            print(f"Error in {name}: {e}")
+                            result = {'error': str(e)}
+
+                        result.update({'algorithm': name, 'distribution': distribution, 'size': size,
+                                       'range_min': range_min, 'range_max': range_max})
+                        self.results[key] = result
+
+        return self.results
+
+    def save_baseline(self, path: str) -> None:
+        """
+        Saves the results as a JSON baseline, along with the settings and environment they were measured with.
+
+        :param path: The JSON file to write.
+        """
+        baseline = {
+            'settings': {'seed': self.seed, 'warmup': self.warmup, 'repeats': self.repeats},
+            'environment': {'python': platform.python_version(), 'platform': platform.platform(),
+                            'numpy': np.__version__},
+            'results': self.results,
+        }
+        with open(path, 'w') as baseline_file:
+            json.dump(baseline, baseline_file, indent=2, sort_keys=True)
+
+    def compare(self, path: str, threshold: float = 0.1) -> List[Dict[str, Any]]:
+        """
+        Compares the results with a JSON baseline.
+
+        :param path: The JSON file written by save_baseline.
+        :param threshold: The tolerated slowdown, as a fraction of the baseline median time.
+        :return: One entry per case whose median time exceeds the baseline median by more than the threshold.
+                 Cases missing from the baseline, or failed in either run, are not compared.
+        """
+        with open(path) as baseline_file:
+            baseline_results = json.load(baseline_file)['results']
+
+        regressions = []
+        for key, result in self.results.items():
+            baseline = baseline_results.get(key)
+            if baseline is None or result.get('error') or baseline.get('error'):
+                continue
+
+            slowdown = result['median_time'] / baseline['median_time'] - 1
+            if slowdown > threshold:
+                regressions.append({'case': key, 'baseline_time': baseline['median_time'],
+                                    'median_time': result['median_time'], 'slowdown': slowdown})
+
+        return regressions
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    """
+    Command line entry point: runs the suite, optionally saves a baseline and fails on regressions.
+
+    :return: The exit status, 1 if any case regressed beyond the threshold.
+    """
+    parser = argparse.ArgumentParser(description="Reproducible sorting benchmarks with regression baselines.")
+    parser.add_argument('--sizes', type=int, nargs='+', default=[1000, 10000, 100000])
+    parser.add_argument('--distributions', nargs='+', default=None)
+    parser.add_argument('--algorithms', nargs='+', default=None, choices=sorted(DEFAULT_ALGORITHMS))
+    parser.add_argument('--range-max', type=int, default=10 ** 6)
+    parser.add_argument('--seed', type=int, default=0)
+    parser.add_argument('--warmup', type=int, default=1)
+    parser.add_argument('--repeats', type=int, default=5)
+    parser.add_argument('--no-memory', action='store_true', help="Skip the tracemalloc peak memory run.")
+    parser.add_argument('--workers', type=int, nargs='+', default=[],
+                        help="Also time ModuloSort.sorter with each of these numbers of worker processes.")
+    parser.add_argument('--cache-dir', default='results/arrays', help="Directory of cached .npy inputs.")
+    parser.add_argument('--baseline', default='results/baseline.json')
+    parser.add_argument('--save-baseline', action='store_true', help="Overwrite the baseline with this run.")
+    parser.add_argument('--threshold', type=float, default=0.1,
+                        help="Tolerated slowdown against the baseline, as a fraction (default 0.1).")
+    args = parser.parse_args(argv)
+
+    algorithms = DEFAULT_ALGORITHMS
+    if args.algorithms is not None:
+        algorithms = {name: DEFAULT_ALGORITHMS[name] for name in args.algorithms}
+    for workers in args.workers:
+        name = f'modulo_sort_workers_{workers}'
+        algorithms = {**algorithms, name: functools.partial(ModuloSort.sorter, workers=workers)}
+
+    suite = BenchmarkSuite(algorithms, seed=args.seed, warmup=args.warmup, repeats=args.repeats,
+                           track_memory=not args.no_memory, cache_dir=args.cache_dir)
+    suite.run(sizes=args.sizes, distributions=args.distributions, ranges=[(10, args.range_max)])
+
+    for key, result in suite.results.items():
+        if result.get('error'):
+            print(f"{key}: error {result['error']}")
+        else:
+            print(f"{key}: median {result['median_time']:.6f}s, IQR {result['iqr_time']:.6f}s, "
+                  f"{result['elements_per_second']:.0f} elements/s, peak memory {result['peak_memory']} bytes")
+
+    if args.save_baseline:
+        suite.save_baseline(args.baseline)
+        print(f"Saved baseline to {args.baseline}")
+        return 0
+
+    try:
+        regressions = suite.compare(args.baseline, args.threshold)
+    except FileNotFoundError:
+        print(f"No baseline at {args.baseline}, run with --save-baseline to create one")
+        return 0
+
+    for regression in regressions:
+        print(f"REGRESSION {regression['case']}: {regression['median_time']:.6f}s against "
+              f"{regression['baseline_time']:.6f}s (+{regression['slowdown']:.0%})")
+    return 1 if regressions else 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
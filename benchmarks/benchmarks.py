@@ -5,11 +5,20 @@ from bucket_sort import BucketSort, QuickBucketSort
 from radix_sort import RadixSort
 import numpy as np
 import pandas as pd
-import random
-from typing import Callable, List, Dict, Any
+from typing import Callable, List, Dict, Any, Optional, Set, Tuple
 import logging
+import gc
+import json
+import multiprocessing
 import time
+import tracemalloc
 import os
+import sys
+
+try:
+    import psutil
+except ImportError:
+    psutil = None
 
 
 
@@ -17,16 +26,29 @@ logging.basicConfig(filename='script.log', level=logging.INFO)
 
 
 class SortingEvaluator:
-    def __init__(self, sorting_algorithms: Dict[str, Callable[[List[Any]], List[Any]]]):
+
+    # Memory columns recorded for every algorithm, as '{name}_{metric}'
+    MEMORY_METRICS = ('peak_memory', 'bytes_per_element', 'rss_delta', 'net_live_blocks')
+
+    def __init__(self, sorting_algorithms: Dict[str, Callable[[List[Any]], List[Any]]], track_memory: bool = False,
+                 results_path: Optional[str] = 'results/results_df.pkl', cache_dir: Optional[str] = None):
         """
         Initializes the SortingEvaluator with a dictionary of sorting algorithms.
 
         :param sorting_algorithms: A dictionary where keys are algorithm names and values are functions implementing the sorting algorithm.
+        :param track_memory: Whether to record the memory use of every algorithm. Each algorithm then runs two more
+                             times after the timed run, an untraced one for the resident set size and the live
+                             blocks and one under tracemalloc for the peak, so a sweep costs about three times as much.
+        :param results_path: Pickle of earlier results that new results are appended to, or None to start empty.
+        :param cache_dir: Directory where generated arrays are cached as .npy files. Arrays are then seeded with the
+                          run number, so repeated sweeps memory-map the same inputs instead of regenerating them.
         """
         self.sorting_algorithms = sorting_algorithms
+        self.track_memory = track_memory
+        self.cache_dir = cache_dir
         self.algorithm_names = list(sorting_algorithms.keys())
         self.results = []
-        self.results_df = pd.read_pickle('results/results_df.pkl') if os.path.isfile('results/results_df.pkl') else None
+        self.results_df = pd.read_pickle(results_path) if results_path and os.path.isfile(results_path) else None
         self.metrics_df = pd.DataFrame()
         self.distribution_metrics_df = pd.DataFrame()
         self.size_metrics_df = pd.DataFrame()
@@ -34,10 +56,12 @@ class SortingEvaluator:
 
 
 
-    def generate_large_random_array(self, size: int, distribution: str, integer: bool, range_min: int, range_max: int,
-                                    percentage_sorted: float = 0.9, duplicate_percentage: float = 0.5) -> List[int]:
+    @staticmethod
+    def generate_array(size: int, distribution: str, integer: bool, range_min: int, range_max: int,
+                       percentage_sorted: float = 0.9, duplicate_percentage: float = 0.5,
+                       seed: Optional[int] = None) -> np.ndarray:
         """
-        Generates a large random array based on the specified distribution and range.
+        Generates a large random array based on the specified distribution and range, with vectorized NumPy operations only.
 
         :param size: Size of the array.
         :param distribution: Type of distribution ('uniform', 'shuffle', 'normal', 'exponential', 'poisson', 'almost_sorted', 'high_duplicates').
@@ -46,68 +70,110 @@ class SortingEvaluator:
         :param range_max: Maximum value for the range.
         :param percentage_sorted: Percentage of the array that should be sorted (used for 'almost_sorted' distribution).
         :param duplicate_percentage: Percentage of duplicates in the array (used for 'high_duplicates' distribution).
+        :param seed: Seed of the random generator, or None for a fresh one.
         :return: Generated array.
         """
+        rng = np.random.default_rng(seed)
+
         if distribution == 'uniform':
             if integer:
-                return np.random.randint(range_min, range_max, size).tolist()
+                return rng.integers(range_min, range_max, size)
             else:
-                return np.random.uniform(range_min, range_max, size).tolist()
+                return rng.uniform(range_min, range_max, size)
 
         elif distribution == 'shuffle':
-            arr = list(range(size))
-            random.shuffle(arr)
-            return arr
+            return rng.permutation(size)
 
         elif distribution == 'normal':
             mean = (range_max + range_min) / 2
             std_dev = (range_max - range_min) / 4
-            array = np.random.normal(mean, std_dev, size).astype(int)
-            array = np.clip(array, range_min, range_max)
-            return array.tolist()
+            array = rng.normal(mean, std_dev, size).astype(int)
+            return np.clip(array, range_min, range_max)
 
         elif distribution == 'exponential':
             scale = (range_max + range_min) / 2
-            array = np.random.exponential(scale, size).astype(int)
-            array = np.clip(array, range_min, range_max)
-            return array.tolist()
-
+            array = rng.exponential(scale, size).astype(int)
+            return np.clip(array, range_min, range_max)
 
         elif distribution == 'almost_sorted':
             # Start with a sorted array
             array = np.arange(size)
 
-            # Determine the number of elements to shuffle
+            # Permute the values at a random subset of the positions
             num_elements_to_shuffle = int(size * (1 - percentage_sorted))
-            indices_to_shuffle = np.random.choice(size, num_elements_to_shuffle, replace=False)
-
-            # Shuffle the selected indices
-            np.random.shuffle(array[indices_to_shuffle])
-            return array.tolist()
+            indices_to_shuffle = rng.choice(size, num_elements_to_shuffle, replace=False)
+            array[indices_to_shuffle] = array[rng.permutation(indices_to_shuffle)]
+            return array
 
         elif distribution == 'high_duplicates':
-            # Start with an empty array
-            array = []
-
-            # Determine the number of unique elements
-            num_unique = int(size * (1 - duplicate_percentage))
-
-            # Generate unique values
-            unique_values = np.random.randint(range_min, range_max, num_unique)
-            array.extend(unique_values)
-
-            # Fill the rest of the array with random choices from the unique values
-            while len(array) < size:
-                array.append(np.random.choice(unique_values))
+            # Generate unique values, then fill the rest of the array with random choices from them
+            num_unique = max(1, int(size * (1 - duplicate_percentage)))
+            unique_values = rng.integers(range_min, range_max, num_unique)
+            array = np.concatenate([unique_values, rng.choice(unique_values, max(0, size - num_unique))])[:size]
 
             # Shuffle the array to avoid any ordering
-            random.shuffle(array)
+            rng.shuffle(array)
             return array
 
         else:
             raise ValueError("Unknown distribution type")
 
+    @staticmethod
+    def cached_array(cache_dir: str, size: int, distribution: str, integer: bool, range_min: int, range_max: int,
+                     percentage_sorted: float = 0.9, duplicate_percentage: float = 0.5, seed: int = 0) -> np.ndarray:
+        """
+        Loads a generated array from the on-disk cache, generating and saving it on the first request.
 
+        :param cache_dir: Directory of the cached .npy files.
+        :param seed: Seed of the random generator. Together with the distribution, size, range and distribution
+                     parameters it forms the cache key.
+        :return: The array, memory-mapped read-only from its .npy file.
+        """
+        name = f"{distribution}_{size}_{range_min}_{range_max}_seed{seed}_{'int' if integer else 'float'}"
+        if distribution == 'almost_sorted':
+            name += f"_sorted{percentage_sorted}"
+        elif distribution == 'high_duplicates':
+            name += f"_duplicates{duplicate_percentage}"
+        path = os.path.join(cache_dir, name + '.npy')
+
+        if not os.path.isfile(path):
+            array = SortingEvaluator.generate_array(size, distribution, integer, range_min, range_max,
+                                                    percentage_sorted, duplicate_percentage, seed)
+            os.makedirs(cache_dir, exist_ok=True)
+
+            # Concurrent workers may generate the same array, so it is written aside and renamed atomically
+            temporary_path = f"{path}.{os.getpid()}.tmp"
+            with open(temporary_path, 'wb') as array_file:
+                np.save(array_file, array)
+            os.replace(temporary_path, path)
+
+        return np.load(path, mmap_mode='r')
+
+    @staticmethod
+    def generate_large_random_array(size: int, distribution: str, integer: bool, range_min: int, range_max: int,
+                                    percentage_sorted: float = 0.9, duplicate_percentage: float = 0.5,
+                                    seed: Optional[int] = None, cache_dir: Optional[str] = None) -> List[int]:
+        """
+        Generates a large random array based on the specified distribution and range.
+
+        :param size: Size of the array.
+        :param distribution: Type of distribution ('uniform', 'shuffle', 'normal', 'exponential', 'poisson', 'almost_sorted', 'high_duplicates').
+        :param integer: Whether to generate integer values.
+        :param range_min: Minimum value for the range.
+        :param range_max: Maximum value for the range.
+        :param percentage_sorted: Percentage of the array that should be sorted (used for 'almost_sorted' distribution).
+        :param duplicate_percentage: Percentage of duplicates in the array (used for 'high_duplicates' distribution).
+        :param seed: Seed of the random generator, or None for a fresh one.
+        :param cache_dir: Directory of cached .npy arrays. Only used when a seed is given.
+        :return: Generated array, as a list of Python numbers.
+        """
+        if cache_dir is not None and seed is not None:
+            array = SortingEvaluator.cached_array(cache_dir, size, distribution, integer, range_min, range_max,
+                                                  percentage_sorted, duplicate_percentage, seed)
+        else:
+            array = SortingEvaluator.generate_array(size, distribution, integer, range_min, range_max,
+                                                    percentage_sorted, duplicate_percentage, seed)
+        return array.tolist()
 
     def is_sorted(self, arr: List[int]) -> bool:
         """
@@ -118,6 +184,69 @@ class SortingEvaluator:
         """
         return all(arr[i] <= arr[i + 1] for i in range(len(arr) - 1))
 
+    def measure_peak_memory(self, algorithm: Callable[[List[Any]], List[Any]], arr: List[int]) -> int:
+        """
+        Measures the peak memory allocated by a sorting algorithm, excluding the input copy.
+
+        The measurement is taken in a separate run, so tracing overhead does not affect the recorded time.
+
+        :param algorithm: The sorting function to measure.
+        :param arr: The original array to be sorted (a copy will be used).
+        :return: Peak traced memory in bytes.
+        """
+        arr_copy = arr.copy()
+        tracemalloc.start()
+        try:
+            algorithm(arr_copy)
+            _, peak = tracemalloc.get_traced_memory()
+        finally:
+            tracemalloc.stop()
+        return peak
+
+    @staticmethod
+    def current_rss() -> Optional[int]:
+        """
+        Reads the resident set size of the current process, using psutil when installed and /proc otherwise.
+
+        :return: Resident memory in bytes, or None if it cannot be read on this platform.
+        """
+        if psutil is not None:
+            return psutil.Process().memory_info().rss
+        try:
+            with open('/proc/self/statm') as statm:
+                return int(statm.read().split()[1]) * os.sysconf('SC_PAGE_SIZE')
+        except (OSError, ValueError):
+            return None
+
+    def measure_memory(self, algorithm: Callable[[List[Any]], List[Any]], arr: List[int]) -> Dict[str, Optional[int]]:
+        """
+        Measures the memory used by a sorting algorithm, excluding the input copy.
+
+        An untraced run records the growth of the resident set size and of the number of allocated memory blocks
+        while the sorted output is still alive, then measure_peak_memory records the peak traced memory.
+
+        :param algorithm: The sorting function to measure.
+        :param arr: The original array to be sorted (a copy will be used).
+        :return: Dictionary with 'peak_memory' and 'bytes_per_element' (traced peak, in total and per input element),
+                 'rss_delta' (bytes, None where RSS cannot be read) and 'net_live_blocks' (interpreter blocks still
+                 allocated after the run minus those allocated before it, which is not the number of allocations and
+                 can be zero or negative for an algorithm that frees as much as it allocates).
+        """
+        arr_copy = arr.copy()
+        gc.collect()
+        rss_before, blocks_before = self.current_rss(), sys.getallocatedblocks()
+        sorted_arr = algorithm(arr_copy)
+        rss_after, blocks_after = self.current_rss(), sys.getallocatedblocks()
+        del sorted_arr, arr_copy
+
+        peak = self.measure_peak_memory(algorithm, arr)
+        return {
+            'peak_memory': peak,
+            'bytes_per_element': peak / len(arr) if len(arr) else None,
+            'rss_delta': rss_after - rss_before if rss_before is not None else None,
+            'net_live_blocks': blocks_after - blocks_before,
+        }
+
     def run_single_evaluation(self, arr: List[int], size: int, distribution: str, range_min: int, range_max: int, integer: bool, run_counter: int) -> Dict[str, Any]:
         """
         Runs a single evaluation of all sorting algorithms on a given array.
@@ -131,6 +260,7 @@ class SortingEvaluator:
         :return: Dictionary with evaluation results.
         """
         row_result = {
+            'run': run_counter,
             'size': size,
             'distribution': distribution,
             'range_min': range_min,
@@ -152,12 +282,17 @@ class SortingEvaluator:
                 row_result[f'{name}_is_sorted'] = True
                 row_result[f'{name}_error'] = None
                 row_result[f'{name}_time'] = elapsed_time
+                if self.track_memory:
+                    for metric, value in self.measure_memory(algorithm, arr).items():
+                        row_result[f'{name}_{metric}'] = value
             except Exception as e:
                 print(f"Error in {name}: {e}")
                 logging.error(f"Error in {name}: {e}")
                 row_result[f'{name}_is_sorted'] = False
                 row_result[f'{name}_error'] = str(e)
                 row_result[f'{name}_time'] = None
+                for metric in self.MEMORY_METRICS:
+                    row_result[f'{name}_{metric}'] = None
 
         return row_result
 
@@ -167,9 +302,12 @@ class SortingEvaluator:
 
         Populates the following attributes:
         - self.metrics_df: DataFrame containing overall metrics for each algorithm.
-        - self.distribution_metrics_df: DataFrame containing average time by distribution.
-        - self.size_metrics_df: DataFrame containing average time by array size.
-        - self.range_metrics_df: DataFrame containing average time by range.
+        - self.distribution_metrics_df: DataFrame containing average time and memory by distribution.
+        - self.size_metrics_df: DataFrame containing average time and memory by array size.
+        - self.range_metrics_df: DataFrame containing average time and memory by range.
+
+        Memory columns ('{name}_avg_peak_memory', '{name}_avg_bytes_per_element', '{name}_avg_rss_delta' and
+        '{name}_avg_net_live_blocks') are only present when the results were recorded with track_memory.
         """
         metrics = {}
         distribution_metrics_df = None
@@ -177,22 +315,26 @@ class SortingEvaluator:
         range_metrics_df = None
 
         for name in self.algorithm_names:
-            distribution_metrics = self.results_df.groupby('distribution')[f'{name}_time'].mean().reset_index()
-            distribution_metrics.rename(columns={f'{name}_time': f'{name}_avg_time'}, inplace=True)
+            columns = [f'{name}_time'] + [f'{name}_{metric}' for metric in self.MEMORY_METRICS
+                                          if f'{name}_{metric}' in self.results_df]
+            averages = {column: column.replace(f'{name}_', f'{name}_avg_', 1) for column in columns}
+
+            distribution_metrics = self.results_df.groupby('distribution')[columns].mean().reset_index()
+            distribution_metrics.rename(columns=averages, inplace=True)
             if distribution_metrics_df is None:
                 distribution_metrics_df = distribution_metrics
             else:
                 distribution_metrics_df = pd.merge(distribution_metrics_df, distribution_metrics, on='distribution', how='outer')
 
-            size_metrics = self.results_df.groupby('size')[f'{name}_time'].mean().reset_index()
-            size_metrics.rename(columns={f'{name}_time': f'{name}_avg_time'}, inplace=True)
+            size_metrics = self.results_df.groupby('size')[columns].mean().reset_index()
+            size_metrics.rename(columns=averages, inplace=True)
             if size_metrics_df is None:
                 size_metrics_df = size_metrics
             else:
                 size_metrics_df = pd.merge(size_metrics_df, size_metrics, on='size', how='outer')
 
-            range_metrics = self.results_df.groupby(['range_min', 'range_max'])[f'{name}_time'].mean().reset_index()
-            range_metrics.rename(columns={f'{name}_time': f'{name}_avg_time'}, inplace=True)
+            range_metrics = self.results_df.groupby(['range_min', 'range_max'])[columns].mean().reset_index()
+            range_metrics.rename(columns=averages, inplace=True)
             if range_metrics_df is None:
                 range_metrics_df = range_metrics
             else:
@@ -206,6 +348,9 @@ class SortingEvaluator:
                 'max_time': valid_times.max(),
                 'median_time': valid_times.median()
             }
+            for metric in self.MEMORY_METRICS:
+                if f'{name}_{metric}' in self.results_df:
+                    metrics[name][f'average_{metric}'] = self.results_df[f'{name}_{metric}'].mean()
 
         self.metrics_df = pd.DataFrame(metrics).T
         self.metrics_df.reset_index(inplace=True)
@@ -214,7 +359,71 @@ class SortingEvaluator:
         self.size_metrics_df = size_metrics_df
         self.range_metrics_df = range_metrics_df
 
-    def evaluate(self, sizes: List[int] = None, distributions: List[str] = None, integer: bool = False, runs: int = 10):
+    @staticmethod
+    def configuration_key(run: int, size: int, distribution: str, range_min: int, range_max: int, integer: bool) -> str:
+        """
+        Builds the key identifying a configuration in the checkpoint store.
+
+        :return: A key such as '1/10000/uniform/10/1000/True'.
+        """
+        return f"{run}/{size}/{distribution}/{range_min}/{range_max}/{integer}"
+
+    @staticmethod
+    def load_checkpoint(checkpoint_path: Optional[str]) -> Dict[str, Dict[str, Any]]:
+        """
+        Reads the results of the configurations finished by earlier, possibly interrupted, sweeps.
+
+        :param checkpoint_path: JSON lines file with one result row per line, or None.
+        :return: The finished result rows, keyed by configuration_key. A truncated last line is ignored and cut off
+                 the file, so that the next appended row starts on a line of its own.
+        """
+        finished = {}
+        if checkpoint_path is None or not os.path.isfile(checkpoint_path):
+            return finished
+
+        with open(checkpoint_path, 'rb+') as checkpoint_file:
+            content = checkpoint_file.read()
+            for line in content.splitlines():
+                try:
+                    row = json.loads(line)
+                except json.JSONDecodeError:
+                    continue
+                key = SortingEvaluator.configuration_key(row['run'], row['size'], row['distribution'],
+                                                         row['range_min'], row['range_max'], row['integer'])
+                finished[key] = row
+
+            # A sweep killed while appending leaves a line without its newline
+            if content and not content.endswith(b'\n'):
+                checkpoint_file.truncate(content.rfind(b'\n') + 1)
+        return finished
+
+    def stored_keys(self) -> Set[str]:
+        """
+        Collects the configurations whose results were loaded from results_path.
+
+        :return: The configuration_key of every row of results_df. Empty if there is no results_df or it predates
+                 the run column.
+        """
+        columns = ['run', 'size', 'distribution', 'range_min', 'range_max', 'integer']
+        if self.results_df is None or not set(columns).issubset(self.results_df.columns):
+            return set()
+        return {self.configuration_key(*row) for row in self.results_df[columns].itertuples(index=False)}
+
+    def evaluate_configuration(self, configuration: Tuple[int, int, str, int, int, bool]) -> Dict[str, Any]:
+        """
+        Generates the array of one configuration and evaluates all sorting algorithms on it.
+
+        :param configuration: A (run, size, distribution, range_min, range_max, integer) tuple.
+        :return: Dictionary with evaluation results.
+        """
+        run, size, dist, range_min, range_max, integer = configuration
+        seed = run if self.cache_dir is not None else None
+        arr = self.generate_large_random_array(size, dist, integer, range_min, range_max, seed=seed,
+                                               cache_dir=self.cache_dir)
+        return self.run_single_evaluation(arr, size, dist, range_min, range_max, integer, run)
+
+    def evaluate(self, sizes: List[int] = None, distributions: List[str] = None, integer: bool = False, runs: int = 10,
+                 workers: int = 1, checkpoint_path: Optional[str] = None):
         """
         Evaluates the sorting algorithms on arrays of varying sizes, distributions, and ranges.
 
@@ -222,6 +431,12 @@ class SortingEvaluator:
         :param distributions: List of distribution types.
         :param integer: Whether to generate integer values.
         :param runs: Number of times to run each algorithm for each configuration.
+        :param workers: Number of worker processes. Every configuration runs in a freshly spawned interpreter, so
+                        results do not depend on what ran before them. Sorting algorithms must then be picklable,
+                        e.g. static methods rather than lambdas. Concurrent workers share the machine, so timings
+                        are only comparable between sweeps run with the same number of workers.
+        :param checkpoint_path: JSON lines file every finished configuration is appended to. Configurations already
+                                in the file are skipped, so an interrupted sweep resumes where it stopped.
         """
         if sizes is None:
             sizes = [1000, 10000, 100000, 1000000, 10000000]
@@ -230,34 +445,84 @@ class SortingEvaluator:
 
         ranges = [(10, 10 ** (i + 1)) for i in range(1, 8)]
 
-        for run in range(runs):
-            for size in sizes:
-                for dist in distributions:
-                    for range_min, range_max in ranges:
-                            arr = self.generate_large_random_array(size, dist, integer, range_min, range_max)
-                            row_result = self.run_single_evaluation(arr, size, dist, range_min, range_max, integer, run + 1)
-                            self.results.append(row_result)
+        configurations = [(run + 1, size, dist, range_min, range_max, integer)
+                          for run in range(runs)
+                          for size in sizes
+                          for dist in distributions
+                          for range_min, range_max in ranges]
+
+        finished = self.load_checkpoint(checkpoint_path)
+        pending = [configuration for configuration in configurations
+                   if self.configuration_key(*configuration) not in finished]
+        if finished:
+            print(f"Resuming: {len(configurations) - len(pending)} of {len(configurations)} configurations already done")
+            logging.info(f"Resuming: {len(configurations) - len(pending)} of {len(configurations)} configurations already done")
+
+        # Checkpointed rows already saved to results_path by the finished sweep are not added a second time
+        keys = {self.configuration_key(*configuration) for configuration in configurations} - self.stored_keys()
+        self.results.extend(row for key, row in finished.items() if key in keys)
+
+        if workers > 1:
+            # Spawned workers that exit after every task give each configuration a fresh interpreter
+            pool = multiprocessing.get_context('spawn').Pool(workers, maxtasksperchild=1)
+            tasks = [(self.sorting_algorithms, self.track_memory, self.cache_dir, configuration)
+                     for configuration in pending]
+            try:
+                for row_result in pool.imap_unordered(_evaluate_in_worker, tasks):
+                    self._store_result(row_result, checkpoint_path)
+            finally:
+                pool.close()
+                pool.join()
+        else:
+            for configuration in pending:
+                self._store_result(self.evaluate_configuration(configuration), checkpoint_path)
+
         new_results = pd.DataFrame(self.results)
         self.results_df = pd.concat([self.results_df, new_results]) if self.results_df is not None else new_results
         self.calculate_metrics()
 
+    def _store_result(self, row_result: Dict[str, Any], checkpoint_path: Optional[str]) -> None:
+        """
+        Keeps the result of a configuration and appends it to the checkpoint store.
 
-sorting_algorithms = {
-    'modulo_sort': ModuloSort.sorter,
-    'radix_sort' : RadixSort.sorter,
-    'radix_bucket_sort': BucketSort.sorter,
-#    'quick_bucket_sort' : QuickBucketSort.sorter,
-    'merge_sort': MergeSort.sorter,
-#    'quick_sort': QuickSort.sorter,
-
-}
-
-evaluator = SortingEvaluator(sorting_algorithms)
-evaluator.evaluate(integer=True, runs=1)
-evaluator.results_df.to_pickle('results/results_df.pkl')
-evaluator.metrics_df.to_pickle('results/metrics_df.pkl')
-evaluator.distribution_metrics_df.to_pickle('results/distribution_metrics_df.pkl')
-evaluator.size_metrics_df.to_pickle('results/size_metrics_df.pkl')
-evaluator.range_metrics_df.to_pickle('results/range_metrics_df.pkl')
-
-
+        :param row_result: Dictionary with evaluation results.
+        :param checkpoint_path: JSON lines file to append to, or None.
+        """
+        self.results.append(row_result)
+        if checkpoint_path is not None:
+            with open(checkpoint_path, 'a') as checkpoint_file:
+                checkpoint_file.write(json.dumps(row_result) + '\n')
+                checkpoint_file.flush()
+                os.fsync(checkpoint_file.fileno())
+
+
+def _evaluate_in_worker(task: Tuple[Dict[str, Callable[[List[Any]], List[Any]]], bool, Optional[str], Tuple]) -> Dict[str, Any]:
+    """
+    Evaluates one configuration in a worker process.
+
+    :param task: A (sorting_algorithms, track_memory, cache_dir, configuration) tuple.
+    :return: Dictionary with evaluation results.
+    """
+    sorting_algorithms, track_memory, cache_dir, configuration = task
+    evaluator = SortingEvaluator(sorting_algorithms, track_memory, results_path=None, cache_dir=cache_dir)
+    return evaluator.evaluate_configuration(configuration)
+
+
+if __name__ == '__main__':
+    sorting_algorithms = {
+        'modulo_sort': ModuloSort.sorter,
+        'radix_sort' : RadixSort.sorter,
+        'radix_bucket_sort': BucketSort.sorter,
+    #    'quick_bucket_sort' : QuickBucketSort.sorter,
+        'merge_sort': MergeSort.sorter,
+    #    'quick_sort': QuickSort.sorter,
+
+    }
+
+    evaluator = SortingEvaluator(sorting_algorithms, cache_dir='results/arrays')
+    evaluator.evaluate(integer=True, runs=1, workers=os.cpu_count() or 1, checkpoint_path='results/checkpoint.jsonl')
+    evaluator.results_df.to_pickle('results/results_df.pkl')
+    evaluator.metrics_df.to_pickle('results/metrics_df.pkl')
+    evaluator.distribution_metrics_df.to_pickle('results/distribution_metrics_df.pkl')
+    evaluator.size_metrics_df.to_pickle('results/size_metrics_df.pkl')
+    evaluator.range_metrics_df.to_pickle('results/range_metrics_df.pkl')
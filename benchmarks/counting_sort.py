@@ -1,4 +1,5 @@
-from typing import List
+from itertools import islice
+from typing import List, MutableSequence, Sequence
 
 
 class CountingSortRadix:
@@ -8,39 +9,39 @@ class CountingSortRadix:
     """
 
     @staticmethod
-    def sorter(arr: List[int], exp: int) -> None:
+    def scatter_binary(source: Sequence[int], target: MutableSequence[int], length: int, shift: int, bits: int,
+                       count: MutableSequence[int]) -> None:
         """
-        Performs counting sort on the array based on the digit represented by exp.
+        Stably moves the first elements of source into target, ordered by a binary digit. Nothing is allocated.
 
         Args:
-            arr (List[int]): The array of integers to be sorted.
-            exp (int): The digit's place to sort by (1 for units, 10 for tens, etc.).
+            source (Sequence[int]): The non-negative integers to be distributed.
+            target (MutableSequence[int]): The buffer receiving the elements.
+            length (int): The number of elements to move, both buffers may be longer.
+            shift (int): The position of the digit's least significant bit.
+            bits (int): The width of the digit in bits.
+            count (MutableSequence[int]): 2 ** bits zeroed counters, used as scratch space.
 
         Returns:
-            None: The array is sorted in place based on the current digit.
+            None
         """
-        n = len(arr)
-        output = [0] * n  # Output array that will have sorted arr
-        count = [0] * 10  # Initialize count array for digits (0-9)
+        mask = (1 << bits) - 1
+        exact = len(source) == length
 
         # Store count of occurrences of digits
-        for i in range(n):
-            index = (arr[i] // exp) % 10
-            count[index] += 1
-
-        # Modify count so that it now contains the actual positions of digits in output[]
-        for i in range(1, 10):
-            count[i] += count[i - 1]
-
-        # Build the output array
-        for i in range(n - 1, -1, -1):
-            index = (arr[i] // exp) % 10
-            output[count[index] - 1] = arr[i]
-            count[index] -= 1
-
-        # Copy the output array to arr, so that arr contains the sorted numbers
-        for i in range(n):
-            arr[i] = output[i]
+        for num in source if exact else islice(source, length):
+            count[(num >> shift) & mask] += 1
+
+        # Modify count so that it now contains the first position of every digit in target[]
+        position = 0
+        for digit in range(mask + 1):
+            count[digit], position = position, position + count[digit]
+
+        # Build the target array, scanning forward keeps equal digits in their original order
+        for num in source if exact else islice(source, length):
+            digit = (num >> shift) & mask
+            target[count[digit]] = num
+            count[digit] += 1
 
 
 class CountingSort:
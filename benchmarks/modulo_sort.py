@@ -1,7 +1,23 @@
-from typing import List
-from radix_sort import RadixSort
+from typing import Any, Callable, Iterator, List, Optional, Tuple, Union
+from array import array
+from bisect import bisect_left, bisect_right
+from heapq import heapify, heappop, heapreplace
+from itertools import chain
+from math import prod
+from operator import itemgetter
+from bucket_planner import BucketPlanner
+from ingest_stats import IngestStats
+from key_transforms import KeyTransforms
+from quantile_buckets import QuantileBuckets
+from radix_sort import RadixBuffers, RadixSort
+from sort_stats import SortStats
 from sorting_utilities import SortingUtils
 
+try:
+    import numpy as np
+except ImportError:
+    np = None
+
 
 class ModuloSort:
 
@@ -9,115 +25,1166 @@ class ModuloSort:
     Implementation of Modulo Sort for positive integer arrays.
     """
 
+    # Minimum input length for which the list-based API hands over to the NumPy backend
+    NUMPY_THRESHOLD = 10000
+
+    # Expected number of values iter_sorted sorts at a time with the NumPy backend
+    ITER_GROUP_SIZE = 65536
+
+    # Minimum input length for which the workers argument starts a process pool
+    PARALLEL_THRESHOLD = 100000
+
+    # Expected number of elements in every value range merge_sorted merges on its own
+    MERGE_RANGE_SIZE = 16384
+
+    # Smallest expected number of elements a shard contributes to a value range of merge_sorted
+    MERGE_PIECE_SIZE = 128
+
+    # Largest number of distinct composite keys columns are packed into, so that the keys fit in int64
+    PACKED_WIDTH = 1 << 63
 
     @staticmethod
-    def sorter(arr: List[int]) -> List[int]:
+    def sorter(arr: List[Any], workers: int = 1, key: Optional[Callable[[Any], int]] = None,
+               planner: Optional[BucketPlanner] = None, ingest: Optional[IngestStats] = None,
+               adaptive: bool = False, stats: Optional[SortStats] = None) -> List[Any]:
         """
         Applies modulo sort on an array of integers.
 
         Args:
-            arr (List[int]): The array of integers to be sorted.
+            arr (List[Any]): The array of integers to be sorted, or of items when key is given.
+            workers (int): The number of processes sorting contiguous bucket ranges in parallel. With the
+                           default of 1 the array is sorted in the calling process.
+            key (Optional[Callable[[Any], int]]): A function returning the integer key of every item. Items with
+                                                  equal keys keep their original order.
+            planner (Optional[BucketPlanner]): The cost model choosing how every bucket is sorted. Pass a
+                                               BucketPlanner(record=True) to inspect its choices afterwards.
+                                               Its route attribute tells which path sorted the array.
+            ingest (Optional[IngestStats]): The statistics of the array, if it was already scanned. The array must
+                                            not have been modified since.
+            adaptive (bool): Whether to bucket the array by quantile segments estimated from a sample, which
+                             keeps buckets small on skewed inputs. Adaptive sorting runs in the calling process.
+            stats (Optional[SortStats]): Filled with the phase timings, the route, the modulo range, the bucket
+                                         statistics, the radix passes and the strategies of the planner. Without
+                                         a planner, a recording one is created. Nothing is timed when None.
 
         Returns:
-            arr (List[int]): The array of integers, sorted in ascending order.
+            arr (List[Any]): The array, sorted in ascending order.
+
+        Raises:
+            ValueError: If ingest was gathered from another array or the length of the array changed since.
+
+        Notes:
+            - Inputs made of a few ascending or descending runs, or sorted apart from a few misplaced elements,
+              skip the buckets and are merged instead, which is close to linear when the disorder is low.
         """
 
         # Return if the lenght of the array is 0
         if len(arr) == 0:
             return arr
 
-        sorted_arr = []
-        buckets = {}
+        if stats is not None:
+            stats.start(len(arr))
 
+        # Items are reordered by the stable permutation of their keys
+        if key is not None:
+            sorted_items = [arr[position] for position in ModuloSort.argsort([key(item) for item in arr])]
+            if stats is not None:
+                stats.route = 'key'
+                stats.lap('argsort')
+            return sorted_items
 
-        # Determine the range of the input array
-        min_value, max_value = SortingUtils.find_min_and_max(arr)
-        modulo_range = int(round((max_value - min_value)/len(arr) + 1, 0))
+        if planner is None:
+            planner = BucketPlanner(record=stats is not None)
 
-        # Find duplicates to be appended after sorting
-        duplicates_dict = SortingUtils.count_duplicates(arr)
+        # A single scan gives the range of the array and how far it already is from sorted
+        if ingest is None:
+            ingest = IngestStats(arr)
+            if stats is not None:
+                stats.lap('ingest')
+        else:
+            ingest.check(arr)
 
-        # Distribute input array values into buckets by floor division, keeping the modulo for the sub-buckets
-        for num in arr:
-            index = int((num - min_value) // modulo_range)
-            modulo_val = int((num - min_value) % modulo_range)
+        # Descending runs are only counted when ascending runs are too short
+        descents = ingest.descents
+        ascents = None
+        if (descents + 1) * BucketPlanner.RUN_LENGTH > len(arr):
+            ascents = ingest.ascents
+
+        # Merging is slower than the vectorized backend, so it is only considered when the array stays in Python
+        merge = adaptive or workers > 1 or not ModuloSort._fits_numpy(ingest)
+        route = planner.choose_route(len(arr), descents + 1, None if ascents is None else ascents + 1, merge)
+        presorted_arr = ModuloSort._presorted(arr, route, planner, stats)
+        if presorted_arr is not None:
+            if stats is not None:
+                stats.lap('merge')
+                ModuloSort._finish_stats(stats, planner, ingest)
+            return presorted_arr
+        if stats is not None:
+            stats.lap('route')
+
+        # Skewed inputs are bucketed by quantiles instead of a single modulo range
+        if adaptive and len(arr) >= 2 * QuantileBuckets.SEGMENT_SIZE:
+            planner.route = 'quantile'
+            sorted_arr = ModuloSort._quantile_sorter(arr, ingest, planner, stats)
+            if stats is not None:
+                ModuloSort._finish_stats(stats, planner, ingest)
+            return sorted_arr
+
+        # Large inputs are split into bucket ranges sorted by a pool of processes
+        if workers > 1 and len(arr) >= ModuloSort.PARALLEL_THRESHOLD:
+            # Imported here because the worker processes sort their shards with ModuloSort.sorter
+            from parallel_sort import ParallelModuloSort
+            sorted_arr = ParallelModuloSort.sorter(arr, workers, ingest, stats)
+            if sorted_arr is not None:
+                planner.route = 'parallel'
+                if stats is not None:
+                    ModuloSort._finish_stats(stats, planner, ingest)
+                return sorted_arr
+
+        # Large integer inputs are handed over to the vectorized backend when NumPy is available
+        np_arr = ModuloSort._as_numpy(arr)
+        if np_arr is not None:
+            planner.route = 'numpy'
+            if stats is not None:
+                stats.lap('to_numpy')
+            sorted_arr = ModuloSort.sorter_np(np_arr, stats).tolist()
+            if stats is not None:
+                stats.lap('to_list')
+                ModuloSort._finish_stats(stats, planner, ingest)
+            return sorted_arr
+
+        # The histogram is built on first use, so it is timed apart from the scatter
+        if stats is not None:
+            bucket_offsets = ingest.bucket_offsets
+            stats.lap('histogram')
+            stats.record_buckets(bucket_offsets)
+
+        # Scatter the modulo values into their buckets
+        min_value, modulo_range, maximum_bucket, bucket_offsets, modulo_values = ModuloSort._distribute(arr, ingest)
+        if stats is not None:
+            stats.lap('distribute')
+
+        # Bucket offsets double as output positions, so every bucket is written straight into place
+        sorted_arr = [0] * len(arr)
+
+        # Radix sort scratch space is shared by all buckets
+        radix_buffers = RadixBuffers()
+        record = planner.record
+
+        for index in range(0, maximum_bucket + 1):
 
-            # Ensure the index is within the correct range
-            index = min(index, len(arr) - 1)
+            start, end = bucket_offsets[index], bucket_offsets[index + 1]
 
-            # If the index already exists, we assign the num to the corresponding modulo value
-            if index in buckets:
-                buckets[index][modulo_val] = num
+            # Get the lenght of the current bucket to sort according to size
+            relative_lenght = end - start
+
+            if relative_lenght == 0:
+                continue
+
+            # Lowest value that can be held by the current bucket
+            bucket_base = min_value + index * modulo_range
+
+            if relative_lenght == 1:
+
+                # We simply place the only value
+                sorted_arr[start] = bucket_base + modulo_values[start]
+                if record:
+                    planner.note('single', 1)
 
-            # Otherwise, we create a new bucket and initialize it as above
             else:
-                buckets[index] = {}
-                buckets[index][modulo_val] = num
 
-        # Identify the upper bound for a bucket index
-        maximum_bucket = int((max_value - min_value) // modulo_range)
+                # The planner picks a strategy from the size of the bucket and the span of its modulo values
+                sorted_arr[start:end] = planner.sort_bucket(list(modulo_values[start:end]), bucket_base,
+                                                            radix_buffers)
+
+        if stats is not None:
+            stats.lap('buckets')
+            stats.radix_passes = radix_buffers.passes
+            ModuloSort._finish_stats(stats, planner, ingest)
+
+        return sorted_arr
+
+    @staticmethod
+    def sorter_inplace(arr: List[int], planner: Optional[BucketPlanner] = None) -> None:
+        """
+        Applies modulo sort on an array of integers in place.
+
+        Args:
+            arr (List[int]): The array of integers to be sorted, a list or an array.array. It is modified in place.
+            planner (Optional[BucketPlanner]): The cost model choosing how every bucket is sorted.
+
+        Returns:
+            None
+
+        Notes:
+            - The array is permuted into bucket order by following cycles, in the manner of American flag sort:
+              every displaced value is swapped straight into the next free slot of its bucket. Every bucket's slice
+              is then sorted and written back.
+            - Extra memory is two offsets per bucket plus a copy of the largest bucket, instead of the modulo value
+              buffer and the output array of sorter.
+        """
+        if len(arr) < 2:
+            return
+
+        ingest = IngestStats(arr)
+        if ingest.descents == 0:
+            return
+
+        if planner is None:
+            planner = BucketPlanner()
 
+        min_value, modulo_range, maximum_bucket = ingest.min_value, ingest.modulo_range, ingest.maximum_bucket
+        bucket_offsets = ingest.bucket_offsets
+
+        # Buckets are filled from left to right, so values found in unfilled slots never belong to earlier buckets
+        next_slot = bucket_offsets[:-1]
         for index in range(0, maximum_bucket + 1):
+            end = bucket_offsets[index + 1]
+            for slot in range(next_slot[index], end):
+                num = arr[slot]
+                target = (num - min_value) // modulo_range
+
+                # Swap the value into its bucket and carry the evicted one along, until the cycle comes back here
+                while target != index:
+                    target_slot = next_slot[target]
+                    next_slot[target] = target_slot + 1
+                    arr[target_slot], num = num, arr[target_slot]
+                    target = (num - min_value) // modulo_range
+
+                arr[slot] = num
+        del next_slot
 
-            # Select the bucket to process
-            current_bucket = buckets.get(index)
+        radix_buffers = RadixBuffers()
+        record = planner.record
 
-            if not current_bucket:
+        for index in range(0, maximum_bucket + 1):
+
+            start, end = bucket_offsets[index], bucket_offsets[index + 1]
+            if end - start == 1 and record:
+                planner.note('single', 1)
+            if end - start < 2:
                 continue
 
-            # Get the lenght of the current bucket to sort according to size
-            relative_lenght = len(current_bucket)
+            # Sorting a slice of the modulo values only copies the current bucket
+            bucket_base = min_value + index * modulo_range
+            sorted_bucket = planner.sort_bucket([num - bucket_base for num in arr[start:end]], bucket_base,
+                                                radix_buffers)
+            arr[start:end] = array(arr.typecode, sorted_bucket) if isinstance(arr, array) else sorted_bucket
+
+    @staticmethod
+    def iter_sorted(arr: List[int], chunk_size: Optional[int] = None, planner: Optional[BucketPlanner] = None,
+                    ingest: Optional[IngestStats] = None) -> Iterator[Union[int, List[int]]]:
+        """
+        Lazily applies modulo sort on an array of integers, yielding the values bucket by bucket.
+
+        Args:
+            arr (List[int]): The array of integers to be sorted.
+            chunk_size (Optional[int]): If given, consecutive buckets are grouped and yielded as lists of at least
+                                        chunk_size values, the last one possibly shorter.
+            planner (Optional[BucketPlanner]): The cost model choosing how every bucket is sorted.
+            ingest (Optional[IngestStats]): The statistics of the array, if it was already scanned. The array must
+                                            not have been modified since.
+
+        Returns:
+            Iterator[Union[int, List[int]]]: The values in the same order as sorter(arr), one by one or in chunks.
+
+        Raises:
+            ValueError: If ingest was gathered from another array or the length of the array changed since.
+
+        Notes:
+            - Every bucket is sorted when it is reached, so the first values come out before the later buckets
+              are sorted and the sorted output is never held in memory as a whole.
+            - With NumPy, large inputs are split into ITER_GROUP_SIZE values wide groups of consecutive buckets
+              by vectorized operations, and every group is sorted by sorter_np when it is reached.
+            - Without NumPy, the histogram and the scatter run over the whole array before the first value, so
+              the first value comes no sooner than from sorter: the gain is memory, not latency.
+        """
+        if len(arr) == 0:
+            return
+
+        if ingest is None:
+            ingest = IngestStats(arr)
+        else:
+            ingest.check(arr)
+
+        np_arr = ModuloSort._as_numpy(arr) if ModuloSort._fits_numpy(ingest) else None
+        if np_arr is not None:
+            blocks = ModuloSort._iter_groups_np(np_arr, ingest)
+        else:
+            blocks = ModuloSort._iter_buckets(arr, ingest, BucketPlanner() if planner is None else planner)
+
+        chunk = []
+        for block in blocks:
+
+            if chunk_size is None:
+                yield from block
+                continue
+
+            chunk.extend(block)
+            if len(chunk) >= chunk_size:
+                yield chunk
+                chunk = []
+
+        if chunk:
+            yield chunk
+
+    @staticmethod
+    def _iter_buckets(arr: List[int], ingest: IngestStats, planner: BucketPlanner) -> Iterator[List[int]]:
+        """
+        Sorts the buckets of an array one after the other.
+
+        Args:
+            arr (List[int]): The array of integers to be sorted.
+            ingest (IngestStats): The statistics of the array.
+            planner (BucketPlanner): The cost model choosing how every bucket is sorted.
+
+        Returns:
+            Iterator[List[int]]: The sorted values of every non-empty bucket, in bucket order.
+        """
+        min_value, modulo_range, maximum_bucket, bucket_offsets, modulo_values = ModuloSort._distribute(arr, ingest)
+        radix_buffers = RadixBuffers()
+
+        for index in range(0, maximum_bucket + 1):
+
+            start, end = bucket_offsets[index], bucket_offsets[index + 1]
+            if start == end:
+                continue
+
+            bucket_base = min_value + index * modulo_range
+            if end - start == 1:
+                if planner.record:
+                    planner.note('single', 1)
+                yield [bucket_base + modulo_values[start]]
+            else:
+                yield planner.sort_bucket(list(modulo_values[start:end]), bucket_base, radix_buffers)
+
+    @staticmethod
+    def _iter_groups_np(np_arr: "np.ndarray", ingest: IngestStats) -> Iterator[List[int]]:
+        """
+        Sorts a NumPy integer array in groups of consecutive buckets, one group after the other.
+
+        Args:
+            np_arr (np.ndarray): The integer array.
+            ingest (IngestStats): The statistics of the array.
+
+        Returns:
+            Iterator[List[int]]: The sorted values of every group, in bucket order.
+
+        Notes:
+            - Groups are numbered with a small unsigned dtype, so the stable argsort gathering them is a radix
+              sort, much cheaper than sorting the values.
+        """
+        groups = -(-np_arr.size // ModuloSort.ITER_GROUP_SIZE)
+        group_index = ModuloSort._bucket_index_np(np_arr, ingest).astype(np.uint64)
+        group_index *= np.uint64(groups)
+        group_index //= np.uint64(ingest.maximum_bucket + 1)
+        group_index = group_index.astype(np.min_scalar_type(groups - 1))
+
+        grouped = np_arr[np.argsort(group_index, kind='stable')]
+        group_ends = np.cumsum(np.bincount(group_index, minlength=groups)).tolist()
+        del group_index
+
+        start = 0
+        for end in group_ends:
+            if end > start:
+                yield ModuloSort.sorter_np(grouped[start:end]).tolist()
+            start = end
+
+    @staticmethod
+    def sorter_np(arr: "np.ndarray", stats: Optional[SortStats] = None) -> "np.ndarray":
+        """
+        Applies modulo sort on a NumPy integer array, using vectorized operations for every step.
+
+        Args:
+            arr (np.ndarray): The array of integers to be sorted.
+            stats (Optional[SortStats]): Filled with the divmod, bincount, argsort and gather timings and the
+                                         bucket statistics. Its recording must already have been started.
+
+        Returns:
+            np.ndarray: A new array with the same dtype, sorted in ascending order.
+
+        Notes:
+            - The quotient/remainder decomposition is the same as in the list-based sorter, so the output
+              is identical to ModuloSort.sorter for the same values.
+            - All arithmetic is carried out on integers, so the full int64 and uint64 ranges are supported.
+            - Float arrays are sorted through the order-preserving uint64 keys of KeyTransforms.
+        """
+        arr = ModuloSort._check_numpy(arr, 'sorter_np')
+        order = ModuloSort.argsort_np(arr, stats)
+        sorted_arr = arr[order]
+        if stats is not None:
+            stats.lap('gather')
+        return sorted_arr
+
+    @staticmethod
+    def argsort_np(keys: "np.ndarray", stats: Optional[SortStats] = None) -> "np.ndarray":
+        """
+        Returns the permutation that stably sorts a NumPy integer array, using vectorized operations for every step.
+
+        Args:
+            keys (np.ndarray): The array of integer or float keys.
+            stats (Optional[SortStats]): Filled with the divmod, bincount and argsort timings and the bucket
+                                         statistics. Its recording must already have been started.
+
+        Returns:
+            np.ndarray: The positions of the keys in ascending key order. Equal keys keep their original order.
+        """
+        keys = ModuloSort._check_numpy(keys, 'argsort_np')
+        if keys.size == 0:
+            return np.empty(0, dtype=np.intp)
+
+        # Floats are mapped to unsigned integers with the same ordering
+        if keys.dtype.kind == 'f':
+            keys = KeyTransforms.encode_np(keys)
+
+        # Determine the range of the input array
+        min_value, max_value = int(keys.min()), int(keys.max())
+        modulo_range = SortingUtils.compute_modulo_range(min_value, max_value, keys.size)
+
+        # Offsets from the minimum always fit in uint64, wrapping arithmetic keeps them exact for signed inputs
+        offsets = keys.astype(np.uint64)
+        offsets -= np.uint64(min_value & 0xFFFFFFFFFFFFFFFF)
+
+        # Floor division gives the bucket, modulo gives the position inside the bucket
+        index, modulo_values = np.divmod(offsets, np.uint64(modulo_range))
+        maximum_bucket = (max_value - min_value) // modulo_range
+        index = index.astype(np.min_scalar_type(maximum_bucket))
+        if stats is not None:
+            stats.lap('divmod')
+
+        # Bucket occupancy and the first output position of every bucket
+        bucket_sizes = np.bincount(index, minlength=maximum_bucket + 1)
+        if stats is not None:
+            stats.lap('bincount')
+            size_counts = np.bincount(bucket_sizes)
+            sizes = np.flatnonzero(size_counts)
+            stats.record_bucket_sizes(dict(zip(sizes.tolist(), size_counts[sizes].tolist())))
+
+        if bucket_sizes.max() == 1:
+            # Every bucket holds at most one element, so elements can be scattered directly by bucket rank
+            positions = np.cumsum(bucket_sizes) - 1
+            order = np.empty(keys.size, dtype=np.intp)
+            order[positions[index]] = np.arange(keys.size)
+        else:
+            # Sort by modulo value first and then stably by bucket index, which orders every bucket internally
+            modulo_values = modulo_values.astype(np.min_scalar_type(modulo_range - 1))
+            order = np.argsort(modulo_values, kind='stable')
+            order = order[np.argsort(index[order], kind='stable')]
+
+        if stats is not None:
+            stats.lap('argsort')
+        return order
+
+    @staticmethod
+    def sorter_typed(arr: List[Union[int, float]], key_type: Optional[str] = None) -> List[Union[int, float]]:
+        """
+        Applies modulo sort on signed 64-bit integers or 64-bit floats through order-preserving unsigned keys.
+
+        Args:
+            arr (List[Union[int, float]]): The values to be sorted.
+            key_type (Optional[str]): One of 'int64', 'uint64' or 'float64'. When None, it is inferred from the
+                                      values by KeyTransforms.infer_key_type, so integers stay exact. Integers
+                                      that fit in no 64-bit key type are then sorted by sorter.
+
+        Returns:
+            List[Union[int, float]]: The values, sorted in ascending order.
+
+        Raises:
+            ValueError: If the key type is unknown, or if an integer does not fit in the given key type.
+
+        Notes:
+            - Every value is mapped to an unsigned 64-bit key by KeyTransforms, the keys are sorted with exact
+              integer arithmetic and mapped back, so mixed signs need no separate handling.
+        """
+        # Validate the key type before anything else
+        if key_type is not None:
+            KeyTransforms.typecode(key_type)
+
+        if len(arr) == 0:
+            return arr
+
+        if key_type is None:
+            key_type = KeyTransforms.infer_key_type(arr)
+
+            # Integers wider than 64 bits have no fixed-width key, but sorter handles them exactly
+            if key_type is None:
+                return ModuloSort.sorter(arr)
+
+        # Large inputs are handed over to the vectorized backend when NumPy is available
+        if np is not None and len(arr) >= ModuloSort.NUMPY_THRESHOLD:
+            KeyTransforms.check_range(arr, key_type)
+            return ModuloSort.sorter_np(np.asarray(arr, dtype=key_type)).tolist()
+
+        keys = KeyTransforms.encode(arr, key_type)
+        return KeyTransforms.decode(ModuloSort.sorter(keys), key_type)
+
+    @staticmethod
+    def argsort(keys: List[int]) -> List[int]:
+        """
+        Returns the permutation that stably sorts an array of integer keys.
+
+        Args:
+            keys (List[int]): The array of integer keys.
+
+        Returns:
+            List[int]: The positions of the keys in ascending key order. Equal keys keep their original order.
+
+        Notes:
+            - Positions rather than modulo values are scattered into the buckets. Inside a bucket, every position
+              is sorted by a composite of its modulo value and its rank in the bucket, which keeps equal keys in
+              input order.
+        """
+        n = len(keys)
+        if n == 0:
+            return []
+
+        # Large integer inputs are handed over to the vectorized backend when NumPy is available
+        np_keys = ModuloSort._as_numpy(keys)
+        if np_keys is not None:
+            return ModuloSort.argsort_np(np_keys).tolist()
+
+        # Determine the range of the keys and the start offset of every bucket in the flat buffer
+        ingest = IngestStats(keys)
+        min_value, modulo_range, maximum_bucket = ingest.min_value, ingest.modulo_range, ingest.maximum_bucket
+        bucket_offsets = ingest.bucket_offsets
+
+        # Scatter the positions into a single flat buffer, every bucket receives them in increasing order
+        positions = SortingUtils.allocate_buffer(n, n)
+        next_slot = bucket_offsets[:-1]
+        for position, num in enumerate(keys):
+            index = (num - min_value) // modulo_range
+            positions[next_slot[index]] = position
+            next_slot[index] += 1
+        del next_slot
+
+        order = [0] * n
+
+        # Radix sort scratch space is shared by all buckets
+        radix_buffers = RadixBuffers()
+
+        for index in range(0, maximum_bucket + 1):
+
+            start, end = bucket_offsets[index], bucket_offsets[index + 1]
+            relative_lenght = end - start
+
+            if relative_lenght == 0:
+                continue
 
             if relative_lenght == 1:
+                order[start] = positions[start]
+                continue
+
+            # Composite keys are unique, and equal modulo values are ordered by their rank in the bucket
+            bucket_base = min_value + index * modulo_range
+            composite = [(keys[positions[start + rank]] - bucket_base) * relative_lenght + rank
+                         for rank in range(relative_lenght)]
 
-                # We get the original values associated with the modulo
-                original_values = list(current_bucket.values())
+            if relative_lenght <= 3:
+                sorted_composite = SortingUtils.sort_small_array(composite, length=relative_lenght)
+            else:
+                sorted_composite = RadixSort.sorter(composite, buffers=radix_buffers)
 
-                # We simply append the only value
-                to_append = original_values[0]
-                SortingUtils.append_duplicates(duplicates_dict=duplicates_dict, to_append=to_append, sorted_arr=sorted_arr)
+            order[start:end] = [positions[start + composite_key % relative_lenght]
+                                for composite_key in sorted_composite]
 
-            elif relative_lenght == 2:
+        return order
 
-                # We get the original values associated with the modulo
-                original_values = list(current_bucket.values())
+    @staticmethod
+    def argsort_columns(columns: List[List[int]]) -> List[int]:
+        """
+        Returns the permutation that stably sorts rows of integers in lexicographic order.
 
-                # We sort the small array before taking care of the duplicates
-                sorted_small = SortingUtils.sort_small_array(original_values, length=2)
+        Args:
+            columns (List[List[int]]): The columns of the rows, all of the same length, the most significant first.
 
-                for to_append in sorted_small:
-                    SortingUtils.append_duplicates(duplicates_dict=duplicates_dict, to_append=to_append,
-                                                   sorted_arr=sorted_arr)
+        Returns:
+            List[int]: The positions of the rows in ascending lexicographic order. Equal rows keep their original
+                       order.
 
-            elif relative_lenght == 3:
+        Raises:
+            ValueError: If there are no columns or the columns have different lengths.
 
-                # We get the original values associated with the modulo
-                original_values = list(current_bucket.values())
+        Notes:
+            - Every column is offset by its minimum and the columns are packed into a single integer key, the
+              earlier columns more significant, which is sorted by argsort.
+            - When the product of the column ranges exceeds PACKED_WIDTH, consecutive columns are packed into
+              groups that fit and the groups are sorted by stable passes, from the least significant one.
+        """
+        if not columns:
+            raise ValueError("argsort_columns needs at least one column")
 
-                # We sort the small array before taking care of the duplicates
-                sorted_small = SortingUtils.sort_small_array(original_values, length=3)
+        n = len(columns[0])
+        if any(len(column) != n for column in columns):
+            raise ValueError("All columns must have the same length")
+        if n == 0:
+            return []
 
-                for to_append in sorted_small:
-                    SortingUtils.append_duplicates(duplicates_dict=duplicates_dict, to_append=to_append,
-                                                   sorted_arr=sorted_arr)
+        lows, widths = [], []
+        for column in columns:
+            low = min(column)
+            lows.append(low)
+            widths.append(max(column) - low + 1)
 
+        # Groups grow towards the more significant columns as long as their packed keys fit
+        order = None
+        end = len(columns)
+        while end > 0:
+            start, width = end - 1, widths[end - 1]
+            while start > 0 and width * widths[start - 1] <= ModuloSort.PACKED_WIDTH:
+                start -= 1
+                width *= widths[start]
 
-            elif relative_lenght > 3:
+            order = ModuloSort._argsort_packed(columns[start:end], lows[start:end], widths[start:end], order)
+            end = start
 
-                # We get the modulo values, which are expected to be easier to sort with Radix sort
-                modulo_values = list(current_bucket.keys())
+        return order
 
-                # We apply Radix sort on the modulo values and append the sorted elements to sorted_arr
-                new_arr = RadixSort.sorter(modulo_values)
-                for j in new_arr:
-                    to_append = current_bucket[j]
-                    SortingUtils.append_duplicates(duplicates_dict=duplicates_dict, to_append=to_append,
-                                                   sorted_arr=sorted_arr)
+    @staticmethod
+    def select(arr: List[int], k: int, ingest: Optional[IngestStats] = None) -> int:
+        """
+        Finds the k-th smallest value of an array of integers without sorting the whole array.
 
+        Args:
+            arr (List[int]): The array of integers.
+            k (int): The zero-based rank of the value, so that select(arr, k) == sorter(arr)[k].
+            ingest (Optional[IngestStats]): The statistics of the array, if it was already scanned. Its bucket
+                                            histogram is reused by later calls on the same array, which must not
+                                            be modified in between.
+
+        Returns:
+            int: The value of rank k.
+
+        Raises:
+            IndexError: If k is not a valid rank.
+            ValueError: If ingest was gathered from another array or the length of the array changed since.
+
+        Notes:
+            - Bucket sizes are counted like in sorter, and only the bucket holding rank k is sorted.
+            - Large inputs are counted with np.bincount and the bucket is pulled out with a mask when NumPy is
+              available.
+        """
+        if not 0 <= k < len(arr):
+            raise IndexError(f"Rank {k} is out of range for an array of {len(arr)} values")
+
+        if ingest is None:
+            ingest = IngestStats(arr)
+        else:
+            ingest.check(arr)
+
+        # Large inputs count their buckets and pull out the target bucket with vectorized operations
+        np_arr = ModuloSort._as_numpy(arr) if ModuloSort._fits_numpy(ingest) else None
+        if np_arr is not None:
+            bucket_index = ModuloSort._bucket_index_np(np_arr, ingest)
+            bucket_ends = np.cumsum(np.bincount(bucket_index, minlength=ingest.maximum_bucket + 1))
+            index = int(np.searchsorted(bucket_ends, k, side='right'))
+            bucket_start = int(bucket_ends[index - 1]) if index else 0
+            return int(ModuloSort.sorter_np(np_arr[bucket_index == index])[k - bucket_start])
+
+        index = ModuloSort._rank_bucket(ingest, k)
+
+        bucket_low = ingest.min_value + index * ingest.modulo_range
+        bucket_high = bucket_low + ingest.modulo_range
+        bucket = [num for num in arr if bucket_low <= num < bucket_high]
+
+        return ModuloSort.sorter(bucket)[k - ingest.bucket_offsets[index]]
+
+    @staticmethod
+    def smallest(arr: List[int], k: int, ingest: Optional[IngestStats] = None) -> List[int]:
+        """
+        Finds the k smallest values of an array of integers without sorting the whole array.
+
+        Args:
+            arr (List[int]): The array of integers.
+            k (int): The number of values to return.
+            ingest (Optional[IngestStats]): The statistics of the array, if it was already scanned. The array must
+                                            not have been modified since.
+
+        Returns:
+            List[int]: The k smallest values in ascending order, the same as sorter(arr)[:k].
+
+        Raises:
+            ValueError: If ingest was gathered from another array or the length of the array changed since.
+
+        Notes:
+            - Bucket sizes are counted like in sorter, and only the values of the buckets up to the one holding
+              rank k - 1 are kept and sorted.
+            - Large inputs are counted and filtered with vectorized operations when NumPy is available.
+        """
+        if k <= 0 or not arr:
+            return []
+        if ingest is None:
+            ingest = IngestStats(arr)
+        else:
+            ingest.check(arr)
+        if k >= len(arr):
+            return ModuloSort.sorter(arr, ingest=ingest)
+
+        np_arr = ModuloSort._as_numpy(arr) if ModuloSort._fits_numpy(ingest) else None
+        if np_arr is not None:
+            bucket_index = ModuloSort._bucket_index_np(np_arr, ingest)
+            bucket_ends = np.cumsum(np.bincount(bucket_index, minlength=ingest.maximum_bucket + 1))
+            index = int(np.searchsorted(bucket_ends, k - 1, side='right'))
+            return ModuloSort.sorter_np(np_arr[bucket_index <= index])[:k].tolist()
+
+        index = ModuloSort._rank_bucket(ingest, k - 1)
+
+        threshold = ingest.min_value + (index + 1) * ingest.modulo_range
+        return ModuloSort.sorter([num for num in arr if num < threshold])[:k]
+
+    @staticmethod
+    def sort_many(arrays: List[List[int]], planner: Optional[BucketPlanner] = None) -> List[List[int]]:
+        """
+        Applies modulo sort on many arrays of integers at once.
+
+        Args:
+            arrays (List[List[int]]): The arrays of integers to be sorted.
+            planner (Optional[BucketPlanner]): The cost model choosing how every bucket is sorted.
+
+        Returns:
+            List[List[int]]: The arrays, each sorted in ascending order, in their original order.
+
+        Notes:
+            - With NumPy, every array is shifted into its own value range above the previous one, so the segment
+              is the most significant part of the key. A single vectorized sort of the concatenation then pays the
+              conversion and the setup once for all arrays, and each sorted array is a slice of the output.
+            - Without NumPy, or below NUMPY_THRESHOLD values in total, there is no speedup over a loop: every
+              array is sorted on its own by sorter. Its time goes to per-element bucket work, which one sort
+              of the shifted concatenation does not save, while shifting and unshifting every value adds to it.
+        """
+        sorted_arrays = ModuloSort._sort_many_np(arrays)
+        if sorted_arrays is None:
+            sorted_arrays = [ModuloSort.sorter(segment, planner=planner) if len(segment) else []
+                             for segment in arrays]
+        return sorted_arrays
+
+    @staticmethod
+    def merge_sorted(shards: List[List[int]]) -> List[int]:
+        """
+        Merges sorted arrays of integers, such as the outputs of sorts run on separate workers.
+
+        Args:
+            shards (List[List[int]]): The arrays, each sorted in ascending order.
+
+        Returns:
+            List[int]: The merged and sorted array. Equal values keep the order of their shards.
+
+        Notes:
+            - The value range is cut into ranges of consecutive modulo sort buckets, each expected to hold
+              MERGE_RANGE_SIZE elements. When there are so many shards that each would contribute fewer than
+              MERGE_PIECE_SIZE elements to a range, the whole input is merged by a single call to sorted, which
+              beats cutting it into ranges of many short pieces.
+            - A heap of shard heads yields the shards whose next value falls into the current range, and only
+              those are split by binary search. Empty ranges are skipped, and a shard alone below the next head of
+              the others is copied up to that head's range as a single slice.
+            - Otherwise the pieces of a range are concatenated and merged by sorted, which detects them as runs
+              and merges them with galloping at C speed.
+        """
+        shards = [shard for shard in shards if len(shard)]
+        if len(shards) <= 1:
+            return list(shards[0]) if shards else []
+
+        n = sum(map(len, shards))
+        min_value = min(shard[0] for shard in shards)
+        max_value = max(shard[-1] for shard in shards)
+
+        # With many shards, the pieces of a range are too short to be worth splitting
+        if n <= ModuloSort.MERGE_RANGE_SIZE or len(shards) > ModuloSort.MERGE_RANGE_SIZE // ModuloSort.MERGE_PIECE_SIZE:
+            return sorted(chain.from_iterable(shards))
+
+        # Ranges are made of whole buckets, so shards holding distinct bucket ranges are copied without merging
+        modulo_range = SortingUtils.compute_modulo_range(min_value, max_value, n)
+        range_width = modulo_range * ModuloSort.MERGE_RANGE_SIZE
+
+        starts = [0] * len(shards)
+        heads = [(shard[0], index) for index, shard in enumerate(shards)]
+        heapify(heads)
+        merged = []
+
+        while len(heads) > 1:
+            head, index = heads[0]
+            boundary = head - (head - min_value) % range_width + range_width
+            other = min(heads[1], heads[2]) if len(heads) > 2 else heads[1]
+
+            # A shard alone in its range is copied up to the range holding the next head of another shard
+            if other[0] >= boundary:
+                shard, start = shards[index], starts[index]
+                end = bisect_left(shard, other[0] - (other[0] - min_value) % range_width, start)
+                merged.extend(shard[start:end])
+                starts[index] = end
+                if end < len(shard):
+                    heapreplace(heads, (shard[end], index))
+                else:
+                    heappop(heads)
+                continue
+
+            pieces = []
+            while heads and heads[0][0] < boundary:
+                index = heads[0][1]
+                shard, start = shards[index], starts[index]
+                end = bisect_left(shard, boundary, start)
+                pieces.append((index, shard[start:end]))
+                starts[index] = end
+                if end < len(shard):
+                    heapreplace(heads, (shard[end], index))
+                else:
+                    heappop(heads)
+
+            # Pieces are chained in shard order, so that the stable sort keeps equal values in that order
+            pieces.sort(key=itemgetter(0))
+            merged.extend(sorted(chain.from_iterable(piece for _, piece in pieces)))
+
+        if heads:
+            index = heads[0][1]
+            merged.extend(shards[index][starts[index]:])
+
+        return merged
+
+    @staticmethod
+    def _sort_many_np(arrays: List[List[int]]) -> Optional[List[List[int]]]:
+        """
+        Sorts many arrays as the shifted segments of one NumPy array.
+
+        Args:
+            arrays (List[List[int]]): The arrays of integers to be sorted.
+
+        Returns:
+            Optional[List[List[int]]]: The sorted arrays, or None if NumPy is unavailable, the batch is smaller
+                                       than NUMPY_THRESHOLD or its values or keys do not fit in int64.
+        """
+        offsets = [0]
+        for segment in arrays:
+            offsets.append(offsets[-1] + len(segment))
+        if np is None or offsets[-1] < ModuloSort.NUMPY_THRESHOLD:
+            return None
+
+        # Consecutive arrays get adjacent key ranges, as narrow as their own ranges
+        shifts = []
+        base = 0
+        for segment in arrays:
+            shift = 0
+            if len(segment):
+                low = min(segment)
+                shift = base - low
+                base += max(segment) - low + 1
+            shifts.append(shift)
+        if base >= 1 << 63:
+            return None
+
+        try:
+            values = np.fromiter(chain.from_iterable(arrays), dtype=np.int64, count=offsets[-1])
+            segment_shifts = np.repeat(np.array(shifts, dtype=np.int64), np.diff(offsets))
+        except OverflowError:
+            return None
+
+        # Sorting keeps every key in its segment, so the shifts are undone position by position
+        sorted_keys = ModuloSort.sorter_np(values + segment_shifts)
+        sorted_keys -= segment_shifts
+        sorted_values = sorted_keys.tolist()
+        return [sorted_values[start:end] for start, end in zip(offsets, offsets[1:])]
+
+    @staticmethod
+    def _argsort_packed(columns: List[List[int]], lows: List[int], widths: List[int],
+                        order: Optional[List[int]]) -> List[int]:
+        """
+        Stably sorts rows, already ordered by their less significant columns, by a group of packed columns.
+
+        Args:
+            columns (List[List[int]]): The columns of the group, the most significant first.
+            lows (List[int]): The minimum of every column.
+            widths (List[int]): The number of possible values of every column.
+            order (Optional[List[int]]): The current order of the rows, or None for their original order.
+
+        Returns:
+            List[int]: The positions of the rows, ordered by the group and then by their current order.
+        """
+        np_columns = [ModuloSort._as_numpy(column) for column in columns]
+        if all(np_column is not None for np_column in np_columns) and prod(widths) <= ModuloSort.PACKED_WIDTH:
+
+            # Large groups are packed with vectorized operations, wrapping arithmetic keeps the offsets exact
+            rows = slice(None) if order is None else np.asarray(order)
+            offsets = [(np_column[rows].astype(np.uint64) - np.uint64(low & 0xFFFFFFFFFFFFFFFF)).astype(np.int64)
+                       for np_column, low in zip(np_columns, lows)]
+
+            keys = offsets[0]
+            for column_offsets, width in zip(offsets[1:], widths[1:]):
+                keys = keys * width + column_offsets
+
+            ranks = ModuloSort.argsort_np(keys)
+            return (ranks if order is None else rows[ranks]).tolist()
+
+        rows = range(len(columns[0])) if order is None else order
+
+        keys = [columns[0][row] - lows[0] for row in rows]
+        for column, low, width in zip(columns[1:], lows[1:], widths[1:]):
+            keys = [key * width + column[row] - low for key, row in zip(keys, rows)]
+
+        ranks = ModuloSort.argsort(keys)
+        return ranks if order is None else [order[rank] for rank in ranks]
+
+    @staticmethod
+    def _quantile_sorter(arr: List[int], ingest: IngestStats, planner: BucketPlanner,
+                         stats: Optional[SortStats] = None) -> List[int]:
+        """
+        Applies modulo sort with variable-width buckets taken from quantile segments.
+
+        Args:
+            arr (List[int]): The array of integers to be sorted.
+            ingest (IngestStats): The statistics of the array.
+            planner (BucketPlanner): The cost model choosing how every bucket is sorted.
+            stats (Optional[SortStats]): Filled with the sample, histogram, distribute and bucket timings, the
+                                         bucket statistics and the radix passes.
+
+        Returns:
+            List[int]: The array, sorted in ascending order.
+
+        Notes:
+            - A value is placed by finding its segment with a binary search on the segment lows, then its
+              bucket with the floor division by the segment's modulo range. Buckets are laid out in one flat
+              buffer, segment after segment.
+        """
+        n, min_value = ingest.length, ingest.min_value
+        layout = QuantileBuckets(ModuloSort.sorter(arr[::QuantileBuckets.sample_stride(n)]), ingest)
+        lows, modulo_ranges, first_buckets = layout.lows, layout.modulo_ranges, layout.first_buckets
+        if stats is not None:
+            stats.lap('sample')
+
+        # Count the values of every bucket, remembering the bucket of every value for the scatter
+        bucket_of = SortingUtils.allocate_buffer(n, layout.bucket_count)
+        bucket_offsets = SortingUtils.allocate_buffer(layout.bucket_count + 1, n)
+        for position, num in enumerate(arr):
+            segment = bisect_right(lows, num) - 1
+            index = first_buckets[segment] + (num - lows[segment]) // modulo_ranges[segment]
+            bucket_of[position] = index
+            bucket_offsets[index + 1] += 1
+
+        for index in range(1, layout.bucket_count + 1):
+            bucket_offsets[index] += bucket_offsets[index - 1]
+        if stats is not None:
+            stats.lap('histogram')
+            stats.record_buckets(bucket_offsets)
+
+        # Values are stored as offsets from the minimum so that the flat buffer stays unsigned
+        offsets = SortingUtils.allocate_buffer(n, ingest.max_value - min_value)
+        next_slot = bucket_offsets[:-1]
+        for num, index in zip(arr, bucket_of):
+            offsets[next_slot[index]] = num - min_value
+            next_slot[index] += 1
+        del next_slot, bucket_of
+        if stats is not None:
+            stats.lap('distribute')
+
+        sorted_arr = [0] * n
+        radix_buffers = RadixBuffers()
+        record = planner.record
+
+        for segment, low in enumerate(lows):
+            modulo_range = modulo_ranges[segment]
+            last_bucket = first_buckets[segment + 1] if segment + 1 < len(lows) else layout.bucket_count
+
+            for index in range(first_buckets[segment], last_bucket):
+
+                start, end = bucket_offsets[index], bucket_offsets[index + 1]
+                if start == end:
+                    continue
+
+                # Offset from the minimum of the lowest value the bucket can hold
+                bucket_offset = low - min_value + (index - first_buckets[segment]) * modulo_range
+
+                if end - start == 1:
+                    sorted_arr[start] = min_value + offsets[start]
+                    if record:
+                        planner.note('single', 1)
+                else:
+                    modulo_values = [offset - bucket_offset for offset in offsets[start:end]]
+                    sorted_arr[start:end] = planner.sort_bucket(modulo_values, min_value + bucket_offset,
+                                                                radix_buffers)
+
+        if stats is not None:
+            stats.lap('buckets')
+            stats.radix_passes = radix_buffers.passes
         return sorted_arr
 
+    @staticmethod
+    def _finish_stats(stats: SortStats, planner: BucketPlanner, ingest: IngestStats) -> None:
+        """
+        Copies the route, the modulo range and the recorded strategies of a finished sort into its statistics.
+
+        Args:
+            stats (SortStats): The statistics of the sort.
+            planner (BucketPlanner): The planner of the sort.
+            ingest (IngestStats): The statistics of the array.
+
+        Returns:
+            None
+        """
+        stats.route = planner.route
+        stats.modulo_range = ingest.modulo_range
+        if planner.record:
+            stats.strategies = planner.summary()
+
+    @staticmethod
+    def _rank_bucket(ingest: IngestStats, k: int) -> int:
+        """
+        Finds the bucket holding the value of rank k.
+
+        Args:
+            ingest (IngestStats): The statistics of the array.
+            k (int): The zero-based rank, smaller than the length of the array.
+
+        Returns:
+            int: The index of the bucket holding rank k.
+        """
+        # Empty buckets share their offset with the next one, so the last bucket starting at or before k holds it
+        return bisect_right(ingest.bucket_offsets, k) - 1
+
+    @staticmethod
+    def _presorted(arr: List[int], route: str, planner: BucketPlanner,
+                   stats: Optional[SortStats] = None) -> Optional[List[int]]:
+        """
+        Sorts an array along one of the presorted routes chosen by the planner.
+
+        Args:
+            arr (List[int]): The array of integers to be sorted.
+            route (str): The route chosen by BucketPlanner.choose_route.
+            planner (BucketPlanner): The planner, whose route is updated if the array falls back to the buckets.
+            stats (Optional[SortStats]): Filled with the number of runs or outliers and the time spent finding
+                                         them. The merge itself is timed by the caller.
+
+        Returns:
+            Optional[List[int]]: The sorted array, or None if the array has to go through the buckets.
+        """
+        if route == 'sorted':
+            if stats is not None:
+                stats.runs = 1
+            return list(arr)
+        elif route == 'reversed':
+            if stats is not None:
+                stats.runs = 1
+            return list(reversed(arr))
+        elif route in ('runs', 'reversed_runs'):
+            runs_arr = arr if route == 'runs' else list(reversed(arr))
+            run_starts = SortingUtils.run_starts(runs_arr)
+            if stats is not None:
+                stats.runs = len(run_starts)
+                stats.lap('run_starts')
+            return SortingUtils.merge_runs(runs_arr, run_starts)
+        elif route == 'outliers':
+            split = SortingUtils.split_outliers(arr, len(arr) // BucketPlanner.RUN_LENGTH)
+            if stats is not None:
+                stats.lap('split_outliers')
+            if split is not None:
+                main, outliers = split
+                sorted_outliers = ModuloSort.sorter(outliers)
+                if stats is not None:
+                    stats.outliers = len(outliers)
+                    stats.lap('sort_outliers')
+                return SortingUtils.gallop_merge(main, sorted_outliers)
+            planner.route = 'buckets'
+        return None
+
+    @staticmethod
+    def _distribute(arr: List[int],
+                    ingest: IngestStats) -> Tuple[int, int, int, Union[array, List[int]], Union[array, List[int]]]:
+        """
+        Scatters the modulo values of an array into a flat buffer of buckets.
+
+        Args:
+            arr (List[int]): The array of integers to be distributed.
+            ingest (IngestStats): The statistics of the array, whose bucket histogram gives the bucket offsets.
 
+        Returns:
+            Tuple[int, int, int, Union[array, List[int]], Union[array, List[int]]]: The minimum value, the modulo
+                range, the largest bucket index, the bucket offsets and the flat buffer of modulo values.
+        """
+        min_value, modulo_range = ingest.min_value, ingest.modulo_range
+        bucket_offsets = ingest.bucket_offsets
 
+        # Scatter the modulo values into a single flat buffer, keeping the floor division as the bucket offset
+        modulo_values = SortingUtils.allocate_buffer(len(arr), modulo_range - 1)
+        next_slot = bucket_offsets[:-1]
+        for num in arr:
+            index, modulo_val = divmod(num - min_value, modulo_range)
+            modulo_values[next_slot[index]] = modulo_val
+            next_slot[index] += 1
+        del next_slot
+
+        return min_value, modulo_range, ingest.maximum_bucket, bucket_offsets, modulo_values
+
+    @staticmethod
+    def _as_numpy(arr: List[int]) -> Optional["np.ndarray"]:
+        """
+        Converts a large list of integers into a NumPy array for the vectorized backend.
+
+        Args:
+            arr (List[int]): The array of integers.
+
+        Returns:
+            Optional[np.ndarray]: The integer array, or None if NumPy is unavailable, the input is smaller than
+                                  NUMPY_THRESHOLD or its values do not fit in a 64-bit dtype.
+        """
+        if np is None or len(arr) < ModuloSort.NUMPY_THRESHOLD:
+            return None
+
+        try:
+            np_arr = np.asarray(arr)
+        except OverflowError:
+            return None
+
+        return np_arr if np_arr.dtype.kind in 'iu' else None
+
+    @staticmethod
+    def _bucket_index_np(np_arr: "np.ndarray", ingest: IngestStats) -> "np.ndarray":
+        """
+        Computes the bucket of every value of a NumPy integer array.
 
+        Args:
+            np_arr (np.ndarray): The integer array.
+            ingest (IngestStats): The statistics of the array, giving its minimum and modulo range.
+
+        Returns:
+            np.ndarray: The bucket index of every value, in the smallest unsigned dtype holding maximum_bucket.
+        """
+        # Offsets from the minimum always fit in uint64, wrapping arithmetic keeps them exact for signed inputs
+        offsets = np_arr.astype(np.uint64)
+        offsets -= np.uint64(ingest.min_value & 0xFFFFFFFFFFFFFFFF)
+        offsets //= np.uint64(ingest.modulo_range)
+        return offsets.astype(np.min_scalar_type(ingest.maximum_bucket))
+
+    @staticmethod
+    def _fits_numpy(ingest: IngestStats) -> bool:
+        """
+        Tells, without converting the array, whether _as_numpy would hand it over to the vectorized backend.
+
+        Args:
+            ingest (IngestStats): The statistics of the array.
+
+        Returns:
+            bool: True if NumPy is available, the array holds at least NUMPY_THRESHOLD values and they fit in
+                  int64 or uint64.
+        """
+        if np is None or ingest.length < ModuloSort.NUMPY_THRESHOLD:
+            return False
+        if ingest.min_value < 0:
+            return ingest.min_value >= -(1 << 63) and ingest.max_value < 1 << 63
+        return ingest.max_value < 1 << 64
+
+    @staticmethod
+    def _check_numpy(arr: "np.ndarray", name: str) -> "np.ndarray":
+        """
+        Validates the input of the vectorized backend.
+
+        Args:
+            arr (np.ndarray): The array passed to the backend.
+            name (str): The name of the calling method, used in error messages.
+
+        Returns:
+            np.ndarray: The input as a flat NumPy integer array.
+        """
+        if np is None:
+            raise ImportError(f"NumPy is required for ModuloSort.{name}")
 
+        arr = np.asarray(arr)
+        if arr.dtype.kind not in 'iuf':
+            raise TypeError(f"ModuloSort.{name} expects an integer or float array, got dtype {arr.dtype}")
 
+        return arr.ravel()
@@ -0,0 +1,216 @@
+from array import array
+from bisect import bisect_right
+from concurrent.futures import ProcessPoolExecutor
+from multiprocessing.shared_memory import SharedMemory
+from typing import List, Optional, Tuple
+from ingest_stats import IngestStats
+from modulo_sort import ModuloSort
+from sort_stats import SortStats
+
+
+class ParallelModuloSort:
+
+    """
+    Implementation of multi-process Modulo Sort, every process sorting a contiguous range of buckets.
+    """
+
+    @staticmethod
+    def sorter(arr: List[int], workers: int, ingest: IngestStats,
+               stats: Optional[SortStats] = None) -> Optional[List[int]]:
+        """
+        Sorts an array by splitting the bucket index space into contiguous shards sorted by separate processes.
+
+        Args:
+            arr (List[int]): The array of integers to be sorted.
+            workers (int): The number of worker processes.
+            ingest (IngestStats): The statistics of the array.
+            stats (Optional[SortStats]): Filled with the timings of every step and the size of every shard.
+
+        Returns:
+            Optional[List[int]]: The sorted array, or None if the values do not fit in 64-bit shared buffers.
+
+        Notes:
+            - Data is exchanged through shared memory, only offsets and per-shard counts are pickled.
+            - Shard boundaries are taken from a strided sample, so that shards hold similar numbers of elements.
+        """
+        n, min_value, modulo_range = ingest.length, ingest.min_value, ingest.modulo_range
+        if min_value < -(1 << 63) or ingest.max_value >= 1 << 63:
+            return None
+
+        # Pick shard boundaries in bucket index space from the quantiles of a sample
+        sample = sorted((num - min_value) // modulo_range for num in arr[::max(1, n // (1000 * workers))])
+        shard_bounds = [sample[len(sample) * k // workers] for k in range(1, workers)]
+
+        # Every worker reads one contiguous chunk of the input
+        chunks = [(n * k // workers, n * (k + 1) // workers) for k in range(workers)]
+
+        input_shm = SharedMemory(create=True, size=8 * n)
+        output_shm = SharedMemory(create=True, size=8 * n)
+        try:
+            ParallelModuloSort._write_shared(input_shm, 0, array('q', arr))
+            if stats is not None:
+                stats.lap('share_input')
+
+            with ProcessPoolExecutor(max_workers=workers) as executor:
+
+                # Count how many elements of every chunk fall into every shard
+                futures = [executor.submit(ParallelModuloSort._count_shards, input_shm.name, start, end, min_value,
+                                           modulo_range, shard_bounds) for start, end in chunks]
+                chunk_counts = [future.result() for future in futures]
+                if stats is not None:
+                    stats.lap('count_shards')
+
+                # Lay shards out one after the other, each chunk writing into its own part of every shard
+                shard_offsets = [0] * (workers + 1)
+                write_offsets = []
+                position = 0
+                for shard in range(workers):
+                    shard_offsets[shard] = position
+                    for counts in chunk_counts:
+                        position += counts[shard]
+                shard_offsets[workers] = position
+                if stats is not None:
+                    stats.shard_sizes = [shard_offsets[shard + 1] - shard_offsets[shard] for shard in range(workers)]
+                for chunk in range(workers):
+                    write_offsets.append([shard_offsets[shard] + sum(counts[shard] for counts in chunk_counts[:chunk])
+                                          for shard in range(workers)])
+
+                # Scatter every chunk into the shards
+                futures = [executor.submit(ParallelModuloSort._scatter_shards, input_shm.name, output_shm.name, start, end,
+                                           min_value, modulo_range, shard_bounds, write_offsets[chunk])
+                           for chunk, (start, end) in enumerate(chunks)]
+                for future in futures:
+                    future.result()
+                if stats is not None:
+                    stats.lap('scatter_shards')
+
+                # Sort every shard in place, once all chunks have been scattered
+                futures = [executor.submit(ParallelModuloSort._sort_shard, output_shm.name, shard_offsets[shard],
+                                           shard_offsets[shard + 1]) for shard in range(workers)]
+                for future in futures:
+                    future.result()
+                if stats is not None:
+                    stats.lap('sort_shards')
+
+            # Shards cover increasing bucket ranges, so the shared buffer already holds the concatenated output
+            sorted_arr = output_shm.buf[:8 * n].cast('q').tolist()
+            if stats is not None:
+                stats.lap('gather')
+            return sorted_arr
+        finally:
+            input_shm.close()
+            input_shm.unlink()
+            output_shm.close()
+            output_shm.unlink()
+
+    @staticmethod
+    def _read_shared(name: str, start: int, end: int) -> Tuple[SharedMemory, array]:
+        """
+        Attaches to a shared int64 buffer and copies the slice [start, end) out of it.
+
+        Args:
+            name (str): The name of the shared memory block.
+            start (int): The first element of the slice.
+            end (int): The end of the slice (exclusive).
+
+        Returns:
+            Tuple[SharedMemory, array]: The attached block, to be closed by the caller, and the copied values.
+        """
+        shm = SharedMemory(name=name)
+        values = array('q')
+        values.frombytes(shm.buf[8 * start:8 * end])
+        return shm, values
+
+    @staticmethod
+    def _write_shared(shm: SharedMemory, start: int, values: array) -> None:
+        """
+        Copies int64 values into a shared buffer, starting at the given element.
+
+        Args:
+            shm (SharedMemory): The attached shared memory block.
+            start (int): The position of the first value in the buffer.
+            values (array): The values to copy, as an array('q').
+
+        Returns:
+            None
+        """
+        if values:
+            shm.buf[8 * start:8 * (start + len(values))] = memoryview(values).cast('B')
+
+    @staticmethod
+    def _count_shards(name: str, start: int, end: int, min_value: int, modulo_range: int,
+                      shard_bounds: List[int]) -> List[int]:
+        """
+        Counts the elements of an input chunk that belong to every shard.
+
+        Args:
+            name (str): The name of the shared input buffer.
+            start (int): The first element of the chunk.
+            end (int): The end of the chunk (exclusive).
+            min_value (int): The minimum value of the whole input.
+            modulo_range (int): The bucket width of the whole input.
+            shard_bounds (List[int]): The first bucket index of every shard but the first one.
+
+        Returns:
+            List[int]: The number of elements of the chunk falling into every shard.
+        """
+        shm, values = ParallelModuloSort._read_shared(name, start, end)
+        shm.close()
+
+        counts = [0] * (len(shard_bounds) + 1)
+        for num in values:
+            counts[bisect_right(shard_bounds, (num - min_value) // modulo_range)] += 1
+        return counts
+
+    @staticmethod
+    def _scatter_shards(input_name: str, output_name: str, start: int, end: int, min_value: int, modulo_range: int,
+                        shard_bounds: List[int], write_offsets: List[int]) -> None:
+        """
+        Copies the elements of an input chunk into the part of every shard reserved for the chunk.
+
+        Args:
+            input_name (str): The name of the shared input buffer.
+            output_name (str): The name of the shared shard buffer.
+            start (int): The first element of the chunk.
+            end (int): The end of the chunk (exclusive).
+            min_value (int): The minimum value of the whole input.
+            modulo_range (int): The bucket width of the whole input.
+            shard_bounds (List[int]): The first bucket index of every shard but the first one.
+            write_offsets (List[int]): The position of the chunk's first element in every shard.
+
+        Returns:
+            None
+        """
+        shm, values = ParallelModuloSort._read_shared(input_name, start, end)
+        shm.close()
+
+        shards = [array('q') for _ in range(len(shard_bounds) + 1)]
+        for num in values:
+            shards[bisect_right(shard_bounds, (num - min_value) // modulo_range)].append(num)
+
+        shm = SharedMemory(name=output_name)
+        try:
+            for offset, shard in zip(write_offsets, shards):
+                ParallelModuloSort._write_shared(shm, offset, shard)
+        finally:
+            shm.close()
+
+    @staticmethod
+    def _sort_shard(name: str, start: int, end: int) -> None:
+        """
+        Sorts one shard of the shared buffer in place.
+
+        Args:
+            name (str): The name of the shared shard buffer.
+            start (int): The first element of the shard.
+            end (int): The end of the shard (exclusive).
+
+        Returns:
+            None
+        """
+        shm, values = ParallelModuloSort._read_shared(name, start, end)
+        try:
+            if len(values) > 1:
+                ParallelModuloSort._write_shared(shm, start, array('q', ModuloSort.sorter(values.tolist())))
+        finally:
+            shm.close()
@@ -0,0 +1,84 @@
+from bisect import bisect_left
+from typing import List
+from ingest_stats import IngestStats
+from sorting_utilities import SortingUtils
+
+
+class QuantileBuckets:
+
+    """
+    Variable-width bucket layout for skewed inputs: quantile segments estimated from a sample, each divided into
+    equal-width buckets by its own modulo range.
+    """
+
+    # Expected number of elements in a quantile segment
+    SEGMENT_SIZE = 256
+
+    # Number of sampled elements per segment boundary
+    OVERSAMPLING = 4
+
+    def __init__(self, sample: List[int], ingest: IngestStats):
+        """
+        Estimates the segment boundaries of an array from a sample.
+
+        Args:
+            sample (List[int]): A sorted sample of the array, such as every sample_stride(n)-th element.
+            ingest (IngestStats): The statistics of the array.
+
+        Notes:
+            - Segments hold roughly equal numbers of elements. Values below the smallest or above the largest
+              sampled value get segments of their own, so outliers do not stretch the buckets of the bulk.
+            - Every segment gets a modulo range from its width and its expected number of elements, the same
+              way modulo sort derives it from the whole range, so its buckets hold about one element each.
+        """
+        n = ingest.length
+        segments = QuantileBuckets.segment_count(n)
+
+        # Cut points at the sample quantiles, plus the sample extremes that fence off the outliers
+        cuts = [sample[0]] + [sample[len(sample) * k // segments] for k in range(1, segments)] + [sample[-1] + 1]
+        self.lows = [ingest.min_value]
+        for cut in cuts:
+            if self.lows[-1] < cut <= ingest.max_value:
+                self.lows.append(cut)
+        highs = self.lows[1:] + [ingest.max_value + 1]
+
+        self.modulo_ranges = []
+        self.first_buckets = []
+        self.bucket_count = 0
+
+        for low, high in zip(self.lows, highs):
+
+            # The share of the sample falling in the segment estimates its number of elements
+            sampled = bisect_left(sample, high) - bisect_left(sample, low)
+            expected = max(1, sampled * n // len(sample))
+
+            modulo_range = SortingUtils.compute_modulo_range(low, high - 1, expected)
+            self.modulo_ranges.append(modulo_range)
+            self.first_buckets.append(self.bucket_count)
+            self.bucket_count += (high - 1 - low) // modulo_range + 1
+
+    @staticmethod
+    def segment_count(n: int) -> int:
+        """
+        Chooses the number of quantile segments for an array.
+
+        Args:
+            n (int): The number of elements in the array.
+
+        Returns:
+            int: The number of segments.
+        """
+        return max(1, n // QuantileBuckets.SEGMENT_SIZE)
+
+    @staticmethod
+    def sample_stride(n: int) -> int:
+        """
+        Chooses the distance between sampled elements.
+
+        Args:
+            n (int): The number of elements in the array.
+
+        Returns:
+            int: The stride giving OVERSAMPLING sampled elements per segment.
+        """
+        return max(1, n // (QuantileBuckets.segment_count(n) * QuantileBuckets.OVERSAMPLING))